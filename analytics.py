@@ -0,0 +1,182 @@
+import numpy as np
+
+from stage_table import StageTable
+
+# Points by stage placing for the points competition (green-jersey style, 1st to 15th)
+STAGE_POINTS = np.array([50, 30, 20, 18, 16, 14, 12, 10, 8, 7, 6, 5, 4, 3, 2])
+FORM_STAGES = 3  # Stages in the recent-form table
+
+
+def build_stage_matrix(stage_by_stage_data, total_stages):
+    """Build a participants x stages matrix of cumulative seconds (NaN where a stage has no time)"""
+    if isinstance(stage_by_stage_data, StageTable):
+        return list(stage_by_stage_data.names), stage_by_stage_data.cumulative_matrix(total_stages)
+
+    names = list(stage_by_stage_data.keys())
+    cumulative = np.full((len(names), total_stages), np.nan)
+
+    for row, participant in enumerate(names):
+        for stage, stage_info in stage_by_stage_data[participant].items():
+            if 1 <= stage <= total_stages:
+                cumulative[row, stage - 1] = stage_info['time_seconds']
+
+    return names, cumulative
+
+def forward_fill(matrix):
+    """Carry the last known value forward along each row (leading gaps become 0)"""
+    filled = np.where(np.isnan(matrix), 0, matrix)
+    known = ~np.isnan(matrix)
+    # Index of the most recent known column for every cell
+    last_known = np.where(known, np.arange(matrix.shape[1]), -1)
+    np.maximum.accumulate(last_known, axis=1, out=last_known)
+    rows = np.arange(matrix.shape[0])[:, None]
+    return np.where(last_known >= 0, filled[rows, np.maximum(last_known, 0)], 0)
+
+def split_matrix(cumulative):
+    """Derive per-stage split times from cumulative times.
+
+    A split is measured from the last stage the participant has a time for,
+    matching how the stage performance chart treats missing stages.
+    """
+    previous = np.zeros_like(cumulative)
+    previous[:, 1:] = forward_fill(cumulative)[:, :-1]
+    return cumulative - previous
+
+def rank_columns(matrix):
+    """Rank each stage column ascending (1 = fastest), sharing ranks on ties; NaN stays unranked"""
+    ranks = np.full(matrix.shape, np.nan)
+    for col in range(matrix.shape[1]):
+        values = matrix[:, col]
+        present = ~np.isnan(values)
+        if not present.any():
+            continue
+        ordered = np.sort(values[present])
+        ranks[present, col] = np.searchsorted(ordered, values[present], side='left') + 1
+    return ranks
+
+def hms_columns(seconds):
+    """Split seconds into stacked (hours, minutes, seconds) integers for numeric hover data"""
+    whole_seconds = np.nan_to_num(seconds).astype(int)
+    return np.stack([whole_seconds // 3600, (whole_seconds % 3600) // 60, whole_seconds % 60], axis=-1)
+
+def gc_order(cumulative):
+    """Row indices ordered by latest known cumulative time (leader first)"""
+    return np.argsort(forward_fill(cumulative)[:, -1], kind='stable')
+
+def countback_keys(cumulative):
+    """Tie-breakers for equal GC times at every stage, each participants x stages (lower is better).
+
+    Countback order: most stage wins so far, then best single stage placing,
+    then lowest sum of stage placings.
+    """
+    split_ranks = rank_columns(split_matrix(cumulative))
+    stage_wins = np.cumsum(split_ranks == 1, axis=1)
+    best_placing = np.minimum.accumulate(np.where(np.isnan(split_ranks), np.inf, split_ranks), axis=1)
+    placing_sum = np.cumsum(np.nan_to_num(split_ranks), axis=1)
+    return [-stage_wins, best_placing, placing_sum]
+
+def tie_aware_ranks(values, tie_breakers):
+    """Rank every column at once by ``values`` then each tie-breaker (all participants x stages, lower is better).
+
+    One ``np.lexsort`` over the flattened matrix orders all columns together;
+    rows equal on every key share the lower rank (1, 2, 2, 4). NaN values stay unranked.
+    """
+    rows, columns = values.shape
+    column_ids = np.repeat(np.arange(columns)[None, :], rows, axis=0).ravel()
+    keys = [key.ravel() for key in (values, *tie_breakers)]
+    # lexsort treats the last key as primary: column first, then values, then each tie-breaker in turn
+    order = np.lexsort(keys[::-1] + [column_ids])
+
+    sorted_columns = column_ids[order]
+    new_column = np.r_[True, sorted_columns[1:] != sorted_columns[:-1]]
+    new_value = new_column.copy()
+    for key in keys:
+        sorted_key = key[order]
+        new_value[1:] |= sorted_key[1:] != sorted_key[:-1]
+
+    positions = np.arange(order.size)
+    column_start = np.maximum.accumulate(np.where(new_column, positions, 0))
+    tie_start = np.maximum.accumulate(np.where(new_value, positions, 0))
+    ranks = np.empty(order.size)
+    ranks[order] = tie_start - column_start + 1
+    ranks = ranks.reshape(rows, columns)
+    ranks[np.isnan(values)] = np.nan
+    return ranks
+
+def gc_rank_matrix(cumulative):
+    """GC position of every participant after every stage, countback-separated and tie-aware"""
+    return tie_aware_ranks(cumulative, countback_keys(cumulative))
+
+def standings_ranks(cumulative):
+    """Current standings positions: each participant's latest time, then countback up to that stage"""
+    latest = np.where(np.isnan(cumulative).all(axis=1), np.nan, forward_fill(cumulative)[:, -1])
+    return tie_aware_ranks(latest[:, None], [key[:, -1:] for key in countback_keys(cumulative)])[:, 0]
+
+def classifications(splits, split_ranks, form_stages=FORM_STAGES):
+    """Secondary classifications from the split matrix (participants x completed stages).
+
+    Returns per-participant values and tie-aware positions for stage wins,
+    points by stage placing, consistency (std of each split's deviation from
+    that stage's median split) and form (total time over the last ``form_stages``
+    stages). Participants missing a form stage are left unranked in that table.
+    """
+    stage_wins = (split_ranks == 1).sum(axis=1)
+
+    placing = np.nan_to_num(split_ranks, nan=0).astype(int)
+    scored = (placing >= 1) & (placing <= len(STAGE_POINTS))
+    points = np.where(scored, STAGE_POINTS[np.clip(placing - 1, 0, len(STAGE_POINTS) - 1)], 0).sum(axis=1)
+
+    # Deviations from the stage median take out stage length, leaving how steady each participant is
+    with np.errstate(invalid='ignore'):
+        deviation = splits - np.nanmedian(np.where(np.isnan(splits).all(axis=0), 0, splits), axis=0)
+    raced = (~np.isnan(splits)).sum(axis=1)
+    spread = np.where(raced >= 2, np.nanstd(np.where(raced[:, None] >= 2, deviation, 0), axis=1), np.nan)
+
+    recent = splits[:, -form_stages:]
+    form = np.where(np.isnan(recent).any(axis=1), np.nan, np.nansum(recent, axis=1))
+
+    values = np.column_stack([-stage_wins, -points, spread, form]).astype(float)
+    positions = tie_aware_ranks(values, [])
+    return {
+        'stage_wins': stage_wins,
+        'points': points,
+        'consistency': spread,
+        'form': form,
+        'stage_wins_position': positions[:, 0],
+        'points_position': positions[:, 1],
+        'consistency_position': positions[:, 2],
+        'form_position': positions[:, 3]
+    }
+
+def percentile_band(matrix, percentiles=(10, 50, 90)):
+    """Per-stage percentiles across all rows, ignoring missing stages"""
+    band = np.full((len(percentiles), matrix.shape[1]), np.nan)
+    present = (~np.isnan(matrix)).any(axis=0)
+    if matrix.shape[0] and present.any():
+        band[:, present] = np.nanpercentile(matrix[:, present], percentiles, axis=0)
+    return band
+
+def reference_gaps(cumulative, reference_row=None):
+    """Gap in seconds of every participant to a reference at each stage (participants x stages).
+
+    ``reference_row=None`` measures against each stage's leader; otherwise against that
+    participant's cumulative times (negative = ahead, NaN where the reference has no time).
+    """
+    reference = np.nanmin(cumulative, axis=0) if reference_row is None else cumulative[reference_row]
+    return cumulative - reference
+
+def pairwise_gap_tensor(cumulative):
+    """Gap of every participant to every other after each stage.
+
+    Returns a participants x participants x stages float32 tensor where
+    ``[a, b, s]`` is how many seconds ``a`` trails ``b`` after stage ``s + 1``
+    (negative when ``a`` is ahead), so any head-to-head is a single slice.
+    """
+    cumulative = cumulative.astype(np.float32)
+    return cumulative[:, None, :] - cumulative[None, :, :]
+
+def lead_changes(gap_series):
+    """Stages (1-based) where the leader of a head-to-head gap series changed"""
+    stages = np.flatnonzero(~np.isnan(gap_series) & (gap_series != 0)) + 1
+    signs = np.sign(gap_series[stages - 1])
+    return stages[1:][signs[1:] != signs[:-1]]
@@ -1,11 +1,30 @@
 import streamlit as st
 import pandas as pd
-import requests
+import os
 from datetime import datetime
 import time
+from html import escape
+from urllib.parse import quote
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import numpy as np
+
+from analytics import (
+    build_stage_matrix, split_matrix, rank_columns, hms_columns, gc_order, percentile_band,
+    pairwise_gap_tensor, lead_changes, gc_rank_matrix, classifications, FORM_STAGES, reference_gaps
+)
+from simulation import simulate_final_positions
+from rosters import build_roster_index, rider_ownership, team_overlap, join_rosters_to_results, build_roster_view, team_roster, search_roster
+from data_sources import source_from_uri
+from resilience import ResilientFetcher, snapshot_path
+from warm_start import WarmStart
+from share_card import get_share_card, share_card_path, SHARE_CARD_URL
+import core
+from core import StandingsError, seconds_to_time_str, calculate_time_gap
+from season_archive import SeasonArchive, archive_season, ARCHIVE_DIR
+from snapshot_diff import ChangeFeed
+from notifier import Notifier, WebhookTarget, notifications_from_events
+from exports import ExportCache, EXPORT_TABLES, EXPORT_FORMATS, excel_available, render_export
 
 # Page configuration
 st.set_page_config(
@@ -16,11 +35,9 @@ st.set_page_config(
 
 # Enhanced Meta Tags for URL Sharing (Open Graph, Twitter Cards, Schema.org)
 st.markdown("""
-    <meta property="og:title" content="Sunshine Fantasy Tour de France 2025 - Live Results" />
-    <meta property="og:description" content="Sunshine Fantasy Tour de France 2025" />
     <meta property="og:type" content="website" />
     <meta property="og:url" content="https://tdf2025.replit.app/" />
-    <meta property="og:image" content="attached_assets/ChatGPT Image Jul 22, 2025, 02_24_08 PM_1753208677017.png" />
+    <!-- og:title, og:description and og:image follow the standings: see create_share_meta_tags -->
     <meta property="og:image:width" content="1200" />
     <meta property="og:image:height" content="630" />
     <meta property="og:locale" content="en_US" />
@@ -28,9 +45,7 @@ st.markdown("""
     
     <!-- Twitter Cards -->
     <meta name="twitter:card" content="summary_large_image" />
-    <meta name="twitter:title" content="Sunshine Fantasy Tour de France 2025" />
-    <meta name="twitter:description" content="Sunshine Fantasy Tour de France 2025" />
-    <meta name="twitter:image" content="attached_assets/ChatGPT Image Jul 22, 2025, 02_24_08 PM_1753208677017.png" />
+    <!-- twitter:title, twitter:description and twitter:image follow the standings: see create_share_meta_tags -->
     
     <!-- Schema.org Structured Data -->
     <script type="application/ld+json">
@@ -89,6 +104,7 @@ st.markdown(
 COMPETITION_CONFIG = {
     "is_complete": True,  # Set to True when competition is finished
     "winner_name": "Aaron",  # Name of the competition winner
+    "season": 2025,  # Archive key for this sheet's data; bump before reusing the sheet for a new season
     "competition_name": "Tour de France 2025",
     "total_stages": 21,
     "completion_date": "July 27, 2025",
@@ -96,37 +112,31 @@ COMPETITION_CONFIG = {
 }
 
 # Google Sheets CSV export URLs
+APP_URL = "https://tdf2025.replit.app/"
+DEFAULT_SHARE_IMAGE = "attached_assets/ChatGPT Image Jul 22, 2025, 02_24_08 PM_1753208677017.png"
+
 SHEET_URL = "https://docs.google.com/spreadsheets/d/1_dYs_80Xdi39_-vtZYxt6l4Mj_0jFuHSf4p79zcBI4M/export?format=csv&gid=0"
 RIDERS_SHEET_URL = "https://docs.google.com/spreadsheets/d/1_dYs_80Xdi39_-vtZYxt6l4Mj_0jFuHSf4p79zcBI4M/export?format=csv&gid=667768222"
 
-def time_to_seconds(time_str):
-    """Convert time string (H:MM:SS) to seconds for comparison"""
-    try:
-        if pd.isna(time_str) or time_str == "0:00:00" or time_str == "":
-            return 0
-        parts = str(time_str).split(':')
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds = int(parts[2])
-        return hours * 3600 + minutes * 60 + seconds
-    except:
-        return 0
-
-def seconds_to_time_str(seconds):
-    """Convert seconds back to time string format"""
-    if seconds == 0:
-        return "0:00:00"
-    hours = seconds // 3600
-    minutes = (seconds % 3600) // 60
-    secs = seconds % 60
-    return f"{hours}:{minutes:02d}:{secs:02d}"
-
-def calculate_time_gap(leader_time, participant_time):
-    """Calculate time gap between leader and participant"""
-    gap_seconds = participant_time - leader_time
-    if gap_seconds == 0:
-        return "Leader"
-    return f"+{seconds_to_time_str(gap_seconds)}"
+# Data sources default to the Google Sheets exports; point these at a local CSV, Parquet or
+# SQLite file (e.g. "league.db#riders") to run offline or replay recorded data
+STANDINGS_SOURCE = os.environ.get("STANDINGS_SOURCE", SHEET_URL)
+RIDERS_SOURCE = os.environ.get("RIDERS_SOURCE", RIDERS_SHEET_URL)
+# Last-known-good copies of each source, served while the upstream is failing
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", ".snapshots")
+# Leader changes and completed stages are posted to these (comma-separated webhook URLs; an
+# HTTP mail endpoint receives email-shaped payloads for the comma-separated recipients)
+NOTIFY_WEBHOOK_URLS = os.environ.get("NOTIFY_WEBHOOK_URLS", "")
+NOTIFY_EMAIL_URL = os.environ.get("NOTIFY_EMAIL_URL", "")
+NOTIFY_EMAIL_TO = os.environ.get("NOTIFY_EMAIL_TO", "")
+
+# Charts switch to WebGL traces and a percentile band above this many participants
+LARGE_FIELD_THRESHOLD = 40
+LARGE_FIELD_TOP_N = 10  # Participants drawn individually in large-field mode
+MAX_STAGE_WINDOW = 7  # Stages shown side by side in the stage performance chart
+SHARED_CACHE_ENTRIES = 4  # Data snapshots kept by each per-snapshot cache (older ones are dropped)
+SHARED_CACHE_TTL = 3600  # Seconds a shared per-snapshot object outlives its last use
+MAX_ROSTER_CARDS = 6  # Team roster cards shown at once; bigger leagues choose which teams to open
 
 def create_winner_banner():
     """Create a celebration banner for the competition winner"""
@@ -221,7 +231,7 @@ def create_winner_banner():
 
 def get_competition_title():
     """Get the appropriate title based on competition status"""
-    base_title = "🚴 Sunshine's Fantasy TDF 2025"
+    base_title = f"🚴 Sunshine's Fantasy TDF {COMPETITION_CONFIG['season']}"
     
     if COMPETITION_CONFIG["is_complete"]:
         return f"{base_title} - COMPLETE ✅"
@@ -257,26 +267,17 @@ def create_completion_status_card():
     </div>
     """, unsafe_allow_html=True)
 
-def generate_share_content(data):
+def generate_share_content(sorted_participants, latest_stage):
     """Generate dynamic content for social sharing based on current standings"""
-    if data is None or len(data) == 0:
-        return {
-            'title': "Fantasy Tour de France 2025",
-            'description': "Track real-time Fantasy Tour de France results with interactive standings and stage analysis!"
-        }
-    
-    # Get current leader
-    leader = data.iloc[0] if not data.empty else None
-    total_stages = 21  # Tour de France standard
+    total_stages = COMPETITION_CONFIG["total_stages"]
     
-    if leader is not None:
-        leader_name = leader.get('Name', 'Unknown')
-        current_stage = 1  # You might want to calculate this from your data
+    if sorted_participants:
+        leader_name = sorted_participants[0][0]
         
         title = f"🚴 {leader_name} leads Fantasy Tour de France!"
-        description = f"Stage {current_stage}/{total_stages} complete. Follow live standings, stage analysis, and team rosters in Sunshine's Fantasy Tour!"
+        description = f"Stage {latest_stage}/{total_stages} complete. Follow live standings, stage analysis, and team rosters in Sunshine's Fantasy Tour!"
     else:
-        title = "Sunshine Fantasy Tour de France 2025"
+        title = f"Sunshine Fantasy Tour de France {COMPETITION_CONFIG['season']}"
         description = "Track real-time Fantasy Tour de France results with interactive standings, stage analysis, and team rosters!"
     
     return {
@@ -284,16 +285,75 @@ def generate_share_content(data):
         'description': description
     }
 
-def create_sharing_buttons():
-    """Create social media sharing buttons"""
-    current_url = "https://your-app-url.replit.app"  # Replace with actual URL
+def get_share_card_hash(sorted_participants, latest_stage):
+    """Render the share card once per standings snapshot and return its hash (None if it can't be written).
+
+    Not cached: every run must touch the card file so the one in the meta tags is never pruned.
+    """
+    try:
+        card_hash, _ = get_share_card(
+            sorted_participants, latest_stage, COMPETITION_CONFIG["total_stages"],
+            f"Sunshine's Fantasy Tour de France {COMPETITION_CONFIG['season']}"
+        )
+    except OSError:
+        return None
+    return card_hash
+
+def share_card_url(card_hash):
+    """Public URL of a rendered share card (Streamlit static serving)"""
+    return f"{APP_URL}{SHARE_CARD_URL}/{card_hash}.png" if card_hash else None
+
+def create_share_meta_tags(share_content, card_hash):
+    """Open Graph / Twitter tags for the current standings, pointing at this snapshot's share card"""
+    title = escape(share_content['title'])
+    description = escape(share_content['description'])
+    image = escape(share_card_url(card_hash) or DEFAULT_SHARE_IMAGE)
+    st.markdown(f"""
+    <meta property="og:title" content="{title}" />
+    <meta property="og:description" content="{description}" />
+    <meta property="og:image" content="{image}" />
+    <meta name="twitter:title" content="{title}" />
+    <meta name="twitter:description" content="{description}" />
+    <meta name="twitter:image" content="{image}" />
+    """, unsafe_allow_html=True)
+
+def create_export_display(processed_data, team_rosters, snapshot_key):
+    """Create the download panel; a file is rendered on its first request and then served from the export cache"""
+    export_cache = get_export_cache()
+    formats = ['csv', 'parquet'] + (['xlsx'] if excel_available() else [])
+    format_labels = {'csv': "CSV", 'parquet': "Parquet", 'xlsx': "Excel (all tables)"}
+    
+    fmt = st.radio("Format:", formats, format_func=format_labels.get, horizontal=True, key="export_format")
+    if not excel_available():
+        st.caption("Excel exports need the openpyxl package")
+    table = 'all' if fmt == 'xlsx' else st.selectbox("Table:", list(EXPORT_TABLES), format_func=EXPORT_TABLES.get, key="export_table")
+    
+    key = (snapshot_key, table, fmt)
+    data = export_cache.get(key)
+    if data is None and st.button("Prepare download", key="export_prepare"):
+        try:
+            data = export_cache.get_or_render(key, lambda: render_export(table, fmt, processed_data, team_rosters))
+        except (OSError, ImportError, ValueError) as e:
+            st.error(f"Could not build the export: {str(e)}")
+            return
+    if data is not None:
+        extension, mime = EXPORT_FORMATS[fmt]
+        file_name = f"fantasy_tdf_{COMPETITION_CONFIG['season']}_{'standings' if table == 'all' else table}.{extension}"
+        st.download_button(f"⬇️ Download {file_name} ({len(data) / 1024:,.0f} KB)", data, file_name=file_name, mime=mime, key="export_download")
+
+def create_sharing_buttons(share_content, card_hash):
+    """Create social media sharing buttons with this snapshot's preview card"""
+    current_url = APP_URL
     
     st.markdown("### 📱 Share This App")
+    card_path = share_card_path(card_hash) if card_hash else None
+    if card_path and os.path.exists(card_path):
+        st.image(card_path, caption=share_content['description'], use_container_width=True)
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        twitter_url = f"https://twitter.com/intent/tweet?url={current_url}&text=Check out Fantasy Tour de France 2025 results! 🚴⚡"
+        twitter_url = f"https://twitter.com/intent/tweet?url={current_url}&text={quote(share_content['title'])}"
         st.markdown(f"[🐦 Tweet]({twitter_url})", unsafe_allow_html=True)
     
     with col2:
@@ -313,141 +373,237 @@ def create_sharing_buttons():
         </button>
         """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_data_source(uri, default_table):
+    """Create one resilient fetcher per URI, kept across reruns so its change token and circuit breaker are shared"""
+    return ResilientFetcher(source_from_uri(uri, default_table), snapshot_path(SNAPSHOT_DIR, uri))
+
 @st.cache_data(ttl=300)  # Cache for 5 minutes
 def fetch_data():
-    """Fetch data from Google Sheets CSV export"""
+    """Fetch standings data, its change token and freshness status from the configured data source"""
     try:
-        # Use session to handle redirects properly
-        session = requests.Session()
-        response = session.get(SHEET_URL, allow_redirects=True)
-        response.raise_for_status()
-        
-        # Read CSV data
-        from io import StringIO
-        csv_data = StringIO(response.text)
-        df = pd.read_csv(csv_data)
-        
-        return df
+        return get_data_source(STANDINGS_SOURCE, 'standings').fetch()
     except Exception as e:
         st.error(f"Error fetching data: {str(e)}")
-        return None
+        return None, None, None
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
 def fetch_riders_data():
-    """Fetch riders data from the Replit_Riders worksheet"""
+    """Fetch riders data (Replit_Riders worksheet), its change token and freshness status from the configured data source"""
     try:
-        # Use session to handle redirects properly
-        session = requests.Session()
-        response = session.get(RIDERS_SHEET_URL, allow_redirects=True)
-        response.raise_for_status()
-        
-        # Read CSV data
-        from io import StringIO
-        csv_data = StringIO(response.text)
-        df = pd.read_csv(csv_data)
-        
-        return df
+        return get_data_source(RIDERS_SOURCE, 'riders').fetch()
     except Exception as e:
         st.error(f"Error fetching riders data: {str(e)}")
-        return None
+        return None, None, None
+
+def create_stale_data_badge(*statuses):
+    """Show a badge when any data is served from the last good snapshot because the upstream is failing"""
+    stale = [status for status in statuses if status and status['stale']]
+    if not stale:
+        return
+    as_of = datetime.fromtimestamp(min(status['fetched_at'] for status in stale)).strftime('%Y-%m-%d %H:%M')
+    st.markdown(
+        f'<div style="background-color: #5c4400; color: #FFD700; border: 1px solid #FFD700; border-radius: 8px; '
+        f'padding: 6px 12px; margin: 4px 0 12px 0; font-size: 14px; display: inline-block;" title="{escape(stale[0]["error"] or "")}">'
+        f'⚠️ Stale data: showing the last good update from {as_of} while Google Sheets is unavailable</div>',
+        unsafe_allow_html=True
+    )
 
 def process_riders_data(riders_df):
     """Process the Replit_Riders worksheet data"""
-    if riders_df is None:
-        return None
-    
-    participants = ['Jeremy', 'Leo', 'Charles', 'Aaron', 'Nate']
-    team_rosters = {participant: [] for participant in participants}
-    
     try:
-        # Clean column names by stripping whitespace
-        riders_df.columns = riders_df.columns.str.strip()
-        
-        # Process each row in the riders DataFrame
-        for idx, row in riders_df.iterrows():
-            if pd.notna(row.get('Rider')) and pd.notna(row.get('Team')):
-                rider_name = str(row['Rider']).strip()
-                team_name = str(row['Team']).strip()
-                
-                # Add rider to the appropriate team if it's one of our participants
-                if team_name in participants:
-                    team_rosters[team_name].append(rider_name)
-    
-    except Exception as e:
-        st.error(f"Error processing rider data: {str(e)}")
+        return core.process_riders_data(riders_df)
+    except StandingsError as e:
+        st.error(str(e))
         return None
-    
-    return team_rosters
+
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES, ttl=SHARED_CACHE_TTL)
+def get_roster_index(team_rosters):
+    """Build the rider ownership index and team overlap matrix once per roster snapshot"""
+    roster_index = build_roster_index(team_rosters)
+    roster_index['overlap'] = team_overlap(roster_index)
+    return roster_index
 
 def process_data(df):
     """Process the raw CSV data to get current standings and stage-by-stage data"""
-    if df is None:
-        return None
-    
-    # Find the participant rows
-    participants = ['Jeremy', 'Leo', 'Charles', 'Aaron', 'Nate']
-    participant_data = {}
-    stage_by_stage_data = {}
-    
-    # Find the latest stage with data (non-zero times)
-    latest_stage = 1
-    
     try:
-        # Look for participant rows in the dataframe
-        for idx, row in df.iterrows():
-            participant_name = str(row.iloc[0]).strip() if pd.notna(row.iloc[0]) else ""
-            
-            if participant_name in participants:
-                stage_times = []
-                all_stage_data = {}
-                
-                # Collect all stage times for this participant
-                for col_idx in range(1, min(22, len(row))):  # Stages 1-21
-                    if col_idx < len(row):
-                        time_val = row.iloc[col_idx]
-                        if pd.notna(time_val) and str(time_val).strip() != "0:00:00" and str(time_val).strip() != "":
-                            stage_times.append((col_idx, time_val))
-                            all_stage_data[col_idx] = {
-                                'time': time_val,
-                                'time_seconds': time_to_seconds(time_val)
-                            }
-                            latest_stage = max(latest_stage, col_idx)
-                
-                if stage_times:
-                    # Get the most recent time for current standings
-                    latest_time = stage_times[-1][1]
-                    participant_data[participant_name] = {
-                        'time': latest_time,
-                        'time_seconds': time_to_seconds(latest_time),
-                        'stage': latest_stage
-                    }
-                    
-                    # Store all stage data for charts
-                    stage_by_stage_data[participant_name] = all_stage_data
-    
-    except Exception as e:
-        st.error(f"Error processing data: {str(e)}")
+        return core.process_data(df)
+    except StandingsError as e:
+        st.error(str(e))
         return None
-    
-    if not participant_data:
-        st.error("No participant data found in the spreadsheet")
-        return None
-    
-    # Sort by time (ascending - lowest time wins)
-    sorted_participants = sorted(
-        participant_data.items(), 
-        key=lambda x: x[1]['time_seconds']
+
+@st.cache_data(max_entries=4)
+def get_processed_data(data_token, _df):
+    """Process the standings once per data change token (unchanged data skips processing)"""
+    processed_data = process_data(_df)
+    if processed_data is not None:
+        archive_current_season(processed_data[2])
+    return processed_data
+
+def archive_current_season(stage_by_stage_data):
+    """Keep this season's stage times and summary in the archive so they outlive the sheet"""
+    try:
+        archive_season(
+            COMPETITION_CONFIG["season"], stage_by_stage_data, COMPETITION_CONFIG["total_stages"], ARCHIVE_DIR,
+            complete=COMPETITION_CONFIG["is_complete"]
+        )
+    except (OSError, ImportError, ValueError) as e:
+        st.warning(f"Could not archive season {COMPETITION_CONFIG['season']}: {str(e)}")
+
+@st.cache_resource
+def get_season_archive():
+    """One archive per process, so loaded seasons are shared between sessions"""
+    return SeasonArchive(ARCHIVE_DIR)
+
+@st.cache_data(max_entries=4)
+def get_team_rosters(riders_token, _riders_df):
+    """Process the rider rosters once per data change token"""
+    return process_riders_data(_riders_df)
+
+def load_current_data():
+    """Fetch and process standings and rosters through the cached pipeline"""
+    df, data_token, data_status = fetch_data()
+    riders_df, riders_token, riders_status = fetch_riders_data()
+    return {
+        'processed_data': get_processed_data(data_token, df),
+        'team_rosters': get_team_rosters(riders_token, riders_df),
+        'data_token': data_token,
+        'riders_token': riders_token,
+        'data_status': data_status,
+        'riders_status': riders_status
+    }
+
+@st.cache_resource
+def get_warm_start():
+    """Load the last processed snapshot once per server process and revalidate it in the background"""
+    return WarmStart(snapshot_path(SNAPSHOT_DIR, f"processed:{STANDINGS_SOURCE}|{RIDERS_SOURCE}"), load_current_data)
+
+@st.cache_resource
+def get_change_feed():
+    """One change feed per process, so every session sees the same snapshot-to-snapshot events"""
+    return ChangeFeed()
+
+@st.cache_resource
+def get_notifier():
+    """One notification dispatcher per process, or None when no targets are configured"""
+    targets = [WebhookTarget(url.strip()) for url in NOTIFY_WEBHOOK_URLS.split(",") if url.strip()]
+    if NOTIFY_EMAIL_URL:
+        recipients = [address.strip() for address in NOTIFY_EMAIL_TO.split(",") if address.strip()]
+        targets.append(WebhookTarget(NOTIFY_EMAIL_URL, style='email', recipients=recipients))
+    return Notifier(targets) if targets else None
+
+@st.cache_resource
+def get_export_cache():
+    """One export cache per process, so every session downloads the same rendered files"""
+    return ExportCache()
+
+@st.fragment(run_every=1)
+def rerun_when_refreshed(warm_start):
+    """Rerun the page once the background refresh has warmed the caches"""
+    if warm_start.refreshed.is_set():
+        st.rerun()
+
+@st.cache_data
+def get_split_matrix(stage_by_stage_data, total_stages):
+    """Build the split matrix (seconds and per-stage ranks) once per data snapshot"""
+    names, cumulative = build_stage_matrix(stage_by_stage_data, total_stages)
+    splits = split_matrix(cumulative)
+    return names, splits, rank_columns(splits)
+
+@st.cache_data
+def get_gc_rank_matrix(stage_by_stage_data, total_stages):
+    """Build the per-stage GC position matrix (tie-aware, countback-separated) once per data snapshot"""
+    names, cumulative = build_stage_matrix(stage_by_stage_data, total_stages)
+    return names, gc_rank_matrix(cumulative)
+
+@st.cache_data
+def get_classifications(stage_by_stage_data, latest_stage):
+    """Compute the secondary classifications from the completed stages once per data snapshot"""
+    names, cumulative = build_stage_matrix(stage_by_stage_data, latest_stage)
+    splits = split_matrix(cumulative)
+    return names, classifications(splits, rank_columns(splits))
+
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES, ttl=SHARED_CACHE_TTL)
+def get_head_to_head_tensor(stage_by_stage_data, latest_stage):
+    """Build the pairwise gap tensor once per data snapshot (cache_resource avoids copying it on every rerun)"""
+    names, cumulative = build_stage_matrix(stage_by_stage_data, latest_stage)
+    return {name: row for row, name in enumerate(names)}, pairwise_gap_tensor(cumulative)
+
+@st.cache_data(show_spinner="Simulating remaining stages...")
+def get_win_probabilities(stage_by_stage_data, latest_stage, total_stages):
+    """Run the Monte Carlo simulation of the remaining stages once per data snapshot"""
+    names, splits, _ = get_split_matrix(stage_by_stage_data, total_stages)
+    current_times = np.nansum(splits, axis=1)  # Latest cumulative time for each participant
+    probabilities = simulate_final_positions(current_times, splits[:, :latest_stage], total_stages - latest_stage)
+    return names, probabilities
+
+def add_large_field_traces(fig, names, values, order, focus, colors, scale, value_label, prefix=''):
+    """Draw top-N and focus participants as WebGL lines and collapse the rest of the field into a percentile band"""
+    stages = np.arange(1, values.shape[1] + 1)
+    row_index = {name: row for row, name in enumerate(names)}
+    highlighted = [int(row) for row in order[:LARGE_FIELD_TOP_N]]
+    for name in focus or []:
+        if name in row_index and row_index[name] not in highlighted:
+            highlighted.append(row_index[name])
+    others = np.setdiff1d(np.arange(len(names)), highlighted)
+    
+    # Everyone outside the highlighted set becomes a 10th-90th percentile band plus a median line
+    if len(others):
+        low, median, high = percentile_band(values[others]) / scale
+        fig.add_trace(go.Scattergl(
+            x=stages,
+            y=high,
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False,
+            hovertemplate='Field 90th percentile: %{y:.2f}<extra></extra>'
+        ))
+        fig.add_trace(go.Scattergl(
+            x=stages,
+            y=low,
+            mode='lines',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor='rgba(160, 160, 160, 0.25)',
+            name=f'Field 10-90% ({len(others)} teams)',
+            hovertemplate='Field 10th percentile: %{y:.2f}<extra></extra>'
+        ))
+        fig.add_trace(go.Scattergl(
+            x=stages,
+            y=median,
+            mode='lines',
+            line=dict(color='#A0A0A0', width=2, dash='dash'),
+            name='Field median',
+            hovertemplate='Field median: %{y:.2f}<extra></extra>'
+        ))
+    
+    # Hover text is assembled client-side from customdata (hours, minutes, seconds, sign);
+    # negative values show a minus sign, others the given prefix
+    hovertemplate = (
+        '<b>%{fullData.name}</b><br>Stage: %{x}<br>' + value_label + ': ' +
+        '%{customdata[3]}%{customdata[0]}:%{customdata[1]:02d}:%{customdata[2]:02d}<extra></extra>'
     )
-    
-    # Calculate gaps from leader
-    leader_time = sorted_participants[0][1]['time_seconds']
-    for name, data in sorted_participants:
-        data['gap'] = calculate_time_gap(leader_time, data['time_seconds'])
-        data['position'] = sorted_participants.index((name, data)) + 1
-    
-    return sorted_participants, latest_stage, stage_by_stage_data
+    palette = px.colors.qualitative.Plotly
+    for i, row in enumerate(highlighted):
+        present = ~np.isnan(values[row])
+        if not present.any():
+            continue
+        customdata = np.empty((int(present.sum()), 4), dtype=object)
+        customdata[:, :3] = hms_columns(np.abs(values[row, present]))
+        customdata[:, 3] = np.where(values[row, present] < 0, '-', prefix)
+        color = colors.get(names[row], palette[i % len(palette)])
+        fig.add_trace(go.Scattergl(
+            x=stages[present],
+            y=values[row, present] / scale,
+            customdata=customdata,
+            mode='lines+markers',
+            name=names[row],
+            line=dict(color=color, width=3),
+            marker=dict(size=6, color=color),
+            hovertemplate=hovertemplate
+        ))
 
-def create_cumulative_time_chart(stage_data, latest_stage):
+def create_cumulative_time_chart(stage_data, latest_stage, focus=None):
     """Create cumulative time progression chart"""
     fig = go.Figure()
     
@@ -460,33 +616,37 @@ def create_cumulative_time_chart(stage_data, latest_stage):
         'Nate': '#96CEB4'
     }
     
-    for participant, stages in stage_data.items():
-        if stages:  # Only show participants with data
-            stages_list = []
-            times_list = []
+    if len(stage_data) > LARGE_FIELD_THRESHOLD:
+        names, cumulative = build_stage_matrix(stage_data, latest_stage)
+        add_large_field_traces(fig, names, cumulative, gc_order(cumulative), focus, colors, 3600, 'Cumulative Time')
+    else:
+        for participant, stages in stage_data.items():
+            if stages:  # Only show participants with data
+                stages_list = []
+                times_list = []
             
-            for stage in range(1, latest_stage + 1):
-                if stage in stages:
-                    stages_list.append(stage)
-                    times_list.append(stages[stage]['time_seconds'] / 3600)  # Convert to hours
+                for stage in range(1, latest_stage + 1):
+                    if stage in stages:
+                        stages_list.append(stage)
+                        times_list.append(stages[stage]['time_seconds'] / 3600)  # Convert to hours
             
-            if stages_list:
-                # Create custom hover text with exact times
-                hover_text = []
-                for stage in stages_list:
-                    time_str = stages[stage]['time']
-                    hover_text.append(f'<b>{participant}</b><br>Stage: {stage}<br>Cumulative Time: {time_str}')
+                if stages_list:
+                    # Create custom hover text with exact times
+                    hover_text = []
+                    for stage in stages_list:
+                        time_str = stages[stage]['time']
+                        hover_text.append(f'<b>{participant}</b><br>Stage: {stage}<br>Cumulative Time: {time_str}')
                 
-                fig.add_trace(go.Scatter(
-                    x=stages_list,
-                    y=times_list,
-                    mode='lines+markers',
-                    name=participant,
-                    line=dict(color=colors.get(participant, '#FFFFFF'), width=3),
-                    marker=dict(size=8, color=colors.get(participant, '#FFFFFF')),
-                    hovertemplate='%{text}<extra></extra>',
-                    text=hover_text
-                ))
+                    fig.add_trace(go.Scatter(
+                        x=stages_list,
+                        y=times_list,
+                        mode='lines+markers',
+                        name=participant,
+                        line=dict(color=colors.get(participant, '#FFFFFF'), width=3),
+                        marker=dict(size=8, color=colors.get(participant, '#FFFFFF')),
+                        hovertemplate='%{text}<extra></extra>',
+                        text=hover_text
+                    ))
     
     # Dark theme styling with mobile responsiveness
     fig.update_layout(
@@ -530,33 +690,12 @@ def create_cumulative_time_chart(stage_data, latest_stage):
     
     return fig
 
-def create_stage_performance_chart(stage_data, latest_stage):
-    """Create individual stage performance chart"""
-    # Calculate stage-specific times (time between stages)
-    stage_performance = {}
-    stage_performance_seconds = {}
-    
-    for participant, stages in stage_data.items():
-        stage_performance[participant] = {}
-        stage_performance_seconds[participant] = {}
-        prev_time = 0
-        
-        for stage in range(1, latest_stage + 1):
-            if stage in stages:
-                current_time = stages[stage]['time_seconds']
-                if stage == 1:
-                    stage_time = current_time
-                else:
-                    stage_time = current_time - prev_time
-                stage_performance[participant][stage] = stage_time / 60  # Convert to minutes for y-axis
-                stage_performance_seconds[participant][stage] = stage_time  # Keep seconds for hover text
-                prev_time = current_time
-    
-    # Create subplot for each stage
-    fig = make_subplots(
-        rows=1, cols=min(latest_stage, 5),  # Show max 5 stages at once
-        subplot_titles=[f'Stage {i}' for i in range(max(1, latest_stage-4), latest_stage + 1)]
-    )
+@st.cache_data(max_entries=SHARED_CACHE_ENTRIES)
+def get_stage_bar_traces(stage_data, latest_stage):
+    """Build every stage's bar trace once per data snapshot; moving the stage window only picks from these (each run gets its own copy)"""
+    names, cumulative = build_stage_matrix(stage_data, latest_stage)
+    # Stage-specific times (time since the participant's previous stage with a time)
+    splits = split_matrix(cumulative)
     
     colors = {
         'Jeremy': '#FFD700',
@@ -565,39 +704,51 @@ def create_stage_performance_chart(stage_data, latest_stage):
         'Aaron': '#45B7D1',
         'Nate': '#96CEB4'
     }
-    
-    stages_to_show = list(range(max(1, latest_stage-4), latest_stage + 1))
-    
-    for col, stage in enumerate(stages_to_show, 1):
-        participants = []
-        times = []
-        bar_colors = []
-        hover_texts = []
-        
-        for participant in stage_performance:
-            if stage in stage_performance[participant]:
-                participants.append(participant)
-                times.append(stage_performance[participant][stage])
-                bar_colors.append(colors.get(participant, '#FFFFFF'))
-                
-                # Convert seconds to H:MM:SS format for hover
-                stage_seconds = stage_performance_seconds[participant][stage]
-                stage_time_str = seconds_to_time_str(int(stage_seconds))
-                hover_texts.append(f'<b>{participant}</b><br>Stage {stage} Time: {stage_time_str}')
-        
-        if participants:
-            fig.add_trace(
-                go.Bar(
-                    x=participants,
-                    y=times,
-                    name=f'Stage {stage}',
-                    marker_color=bar_colors,
-                    showlegend=False,
-                    hovertemplate='%{text}<extra></extra>',
-                    text=hover_texts
-                ),
-                row=1, col=col
-            )
+    bar_colors = [colors.get(participant, '#FFFFFF') for participant in names]
+    
+    traces = []
+    for stage in range(1, latest_stage + 1):
+        rows = np.flatnonzero(~np.isnan(splits[:, stage - 1])).tolist()
+        stage_seconds = splits[rows, stage - 1].astype(int).tolist()
+        traces.append(dict(
+            type='bar',
+            x=[names[row] for row in rows],
+            y=[seconds / 60 for seconds in stage_seconds],  # Minutes for the y-axis
+            name=f'Stage {stage}',
+            marker=dict(color=[bar_colors[row] for row in rows]),
+            showlegend=False,
+            hovertemplate='%{text}<extra></extra>',
+            text=[f'<b>{names[row]}</b><br>Stage {stage} Time: {seconds_to_time_str(seconds)}' for row, seconds in zip(rows, stage_seconds)]
+        ))
+    return traces
+
+def create_stage_performance_chart(stage_data, latest_stage, first_stage=None, last_stage=None):
+    """Create individual stage performance chart for a window of stages (default: the last five)"""
+    last_stage = last_stage or latest_stage
+    first_stage = first_stage or max(1, last_stage - 4)
+    stage_traces = get_stage_bar_traces(stage_data, latest_stage)
+    
+    # Lay the stages out side by side by hand: assembling a few axes from the cached
+    # traces is much cheaper than a make_subplots grid on every window change
+    stages = list(range(first_stage, last_stage + 1))
+    spacing = 0.04 if len(stages) > 1 else 0
+    width = (1 - spacing * (len(stages) - 1)) / len(stages)
+    traces = []
+    layout = {}
+    annotations = []
+    for col, stage in enumerate(stages, 1):
+        suffix = "" if col == 1 else str(col)
+        start = (col - 1) * (width + spacing)
+        layout[f'xaxis{suffix}'] = dict(domain=[start, start + width], anchor=f'y{suffix}', tickangle=45, gridcolor='#404040', tickfont=dict(color='#FFFFFF'))
+        layout[f'yaxis{suffix}'] = dict(anchor=f'x{suffix}', gridcolor='#404040', tickfont=dict(color='#FFFFFF'))
+        annotations.append(dict(
+            text=f'Stage {stage}', x=start + width / 2, y=1, xref='paper', yref='paper',
+            xanchor='center', yanchor='bottom', showarrow=False, font=dict(color='#FFFFFF', size=14)
+        ))
+        if stage_traces[stage - 1]['x']:
+            traces.append(dict(stage_traces[stage - 1], xaxis=f'x{suffix}', yaxis=f'y{suffix}'))
+    
+    fig = go.Figure(data=traces, layout=layout)
     
     # Dark theme styling
     fig.update_layout(
@@ -606,6 +757,7 @@ def create_stage_performance_chart(stage_data, latest_stage):
             'x': 0.5,
             'font': {'size': 16, 'color': '#FFFFFF'}
         },
+        annotations=annotations,
         plot_bgcolor='#1e1e1e',
         paper_bgcolor='#1e1e1e',
         font=dict(color='#FFFFFF', size=11),
@@ -613,44 +765,42 @@ def create_stage_performance_chart(stage_data, latest_stage):
         height=350
     )
     
-    # Update all subplot axes and annotations
-    for i in range(1, min(latest_stage, 5) + 1):
-        fig.update_xaxes(
-            tickangle=45,
-            gridcolor='#404040',
-            tickfont=dict(color='#FFFFFF'),
-            row=1, col=i
-        )
-        fig.update_yaxes(
-            gridcolor='#404040',
-            tickfont=dict(color='#FFFFFF'),
-            row=1, col=i
-        )
-    
-    # Update subplot titles color - use layout update method
-    try:
-        # Update annotations via layout update to avoid direct access issues
-        current_annotations = getattr(fig.layout, 'annotations', None)
-        if current_annotations:
-            fig.update_layout(
-                annotations=[
-                    dict(
-                        text=getattr(annotation, 'text', ''),
-                        x=getattr(annotation, 'x', 0.5),
-                        y=getattr(annotation, 'y', 1),
-                        xref=getattr(annotation, 'xref', 'paper'),
-                        yref=getattr(annotation, 'yref', 'paper'),
-                        font=dict(color='#FFFFFF', size=14)
-                    ) for annotation in current_annotations
-                ]
-            )
-    except Exception:
-        pass  # Skip if annotations not available
-    
     return fig
 
-def create_gap_evolution_chart(stage_data, latest_stage):
-    """Create chart showing gap evolution relative to leader"""
+@st.fragment
+def create_stage_performance_display(stage_data, latest_stage):
+    """Create the stage performance chart with its stage window control (reruns on its own when the window moves)"""
+    first_stage, last_stage = max(1, latest_stage - 4), latest_stage
+    if latest_stage > 1:
+        first_stage, last_stage = st.slider("Stages:", 1, latest_stage, (first_stage, last_stage))
+        if last_stage - first_stage + 1 > MAX_STAGE_WINDOW:
+            first_stage = last_stage - MAX_STAGE_WINDOW + 1
+            st.caption(f"Showing the last {MAX_STAGE_WINDOW} stages of the selected range (Stages {first_stage}-{last_stage})")
+    st.plotly_chart(
+        create_stage_performance_chart(stage_data, latest_stage, first_stage, last_stage),
+        use_container_width=True
+    )
+    st.markdown('<p class="analysis-text" style="color: #ffffff !important; font-weight: bold;">Analysis:</p><p class="analysis-description" style="color: #e0e0e0 !important;">Displays individual stage times to identify stage winners and performance patterns.</p>', unsafe_allow_html=True)
+
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES, ttl=SHARED_CACHE_TTL)
+def get_stage_matrix(stage_by_stage_data, latest_stage):
+    """Build the cumulative time matrix and GC order once per data snapshot (shared, never copied)"""
+    names, cumulative = build_stage_matrix(stage_by_stage_data, latest_stage)
+    return names, cumulative, gc_order(cumulative)
+
+def format_signed_gap(gap_seconds, zero_label):
+    """Format a gap as +H:MM:SS / -H:MM:SS, or ``zero_label`` when level"""
+    if gap_seconds == 0:
+        return zero_label
+    return f"{'-' if gap_seconds < 0 else '+'}{seconds_to_time_str(abs(gap_seconds))}"
+
+@st.cache_data(max_entries=32)
+def get_gap_evolution_chart(stage_data, latest_stage, focus=None, reference=None):
+    """Build the gap chart once per data snapshot, reference and highlighted teams (each run gets its own copy)"""
+    return create_gap_evolution_chart(stage_data, latest_stage, focus, reference)
+
+def create_gap_evolution_chart(stage_data, latest_stage, focus=None, reference=None):
+    """Create chart showing gap evolution relative to each stage's leader, or to a ``reference`` participant"""
     fig = go.Figure()
     
     colors = {
@@ -661,53 +811,49 @@ def create_gap_evolution_chart(stage_data, latest_stage):
         'Nate': '#96CEB4'
     }
     
-    # Find leader at each stage and calculate gaps
-    for participant, stages in stage_data.items():
-        if stages:
-            stages_list = []
-            gaps_list = []
-            
-            for stage in range(1, latest_stage + 1):
-                if stage in stages:
-                    # Find leader time for this stage
-                    leader_time = min([
-                        stage_data[p][stage]['time_seconds'] 
-                        for p in stage_data 
-                        if stage in stage_data[p]
-                    ])
-                    
-                    gap_seconds = stages[stage]['time_seconds'] - leader_time
-                    stages_list.append(stage)
-                    gaps_list.append(gap_seconds / 60)  # Convert to minutes
-            
-            if stages_list and any(gap > 0 for gap in gaps_list):  # Don't show leader line
-                # Create custom hover text with exact gap times
-                hover_text = []
-                for i, stage in enumerate(stages_list):
-                    gap_seconds = gaps_list[i] * 60  # Convert back to seconds
-                    gap_time_str = calculate_time_gap(0, int(gap_seconds))  # Format as "+H:MM:SS"
-                    hover_text.append(f'<b>{participant}</b><br>Stage: {stage}<br>Gap to Leader: {gap_time_str}')
-                
-                fig.add_trace(go.Scatter(
-                    x=stages_list,
-                    y=gaps_list,
-                    mode='lines+markers',
-                    name=participant,
-                    line=dict(color=colors.get(participant, '#FFFFFF'), width=3),
-                    marker=dict(size=8, color=colors.get(participant, '#FFFFFF')),
-                    hovertemplate='%{text}<extra></extra>',
-                    text=hover_text
-                ))
+    # One subtraction against the cumulative matrix gives every gap at every stage
+    names, cumulative, order = get_stage_matrix(stage_data, latest_stage)
+    reference_row = names.index(reference) if reference in names else None
+    gaps = reference_gaps(cumulative, reference_row)
+    reference_label = reference if reference_row is not None else "Leader"
+    zero_label = "Level" if reference_row is not None else "Leader"
+    
+    if len(names) > LARGE_FIELD_THRESHOLD:
+        # Keep the reference drawn individually alongside the top teams
+        focus = list(focus or []) + ([reference] if reference_row is not None else [])
+        add_large_field_traces(fig, names, gaps, order, focus, colors, 60, f'Gap to {reference_label}', prefix='+')
+    else:
+        stages = np.arange(1, latest_stage + 1)
+        for row, participant in enumerate(names):
+            present = ~np.isnan(gaps[row])
+            if not present.any():
+                continue
+            gap_seconds = gaps[row, present].astype(int)
+            # Custom hover text with exact gap times
+            hover_text = [
+                f'<b>{participant}</b><br>Stage: {stage}<br>Gap to {reference_label}: {format_signed_gap(gap, zero_label)}'
+                for stage, gap in zip(stages[present], gap_seconds)
+            ]
+            fig.add_trace(go.Scatter(
+                x=stages[present],
+                y=gap_seconds / 60,  # Convert to minutes
+                mode='lines+markers',
+                name=participant,
+                line=dict(color=colors.get(participant, '#FFFFFF'), width=3),
+                marker=dict(size=8, color=colors.get(participant, '#FFFFFF')),
+                hovertemplate='%{text}<extra></extra>',
+                text=hover_text
+            ))
     
     # Dark theme styling with mobile responsiveness
     fig.update_layout(
         title={
-            'text': 'Time Gap Evolution (Minutes Behind Leader)',
+            'text': f'Time Gap Evolution (Minutes Behind {reference_label})',
             'x': 0.5,
             'font': {'size': 16, 'color': '#FFFFFF'}
         },
         xaxis_title='Stage',
-        yaxis_title='Gap to Leader (Minutes)',
+        yaxis_title=f'Gap to {reference_label} (Minutes)',
         plot_bgcolor='#1e1e1e',
         paper_bgcolor='#1e1e1e',
         font=dict(color='#FFFFFF', size=11),
@@ -741,12 +887,187 @@ def create_gap_evolution_chart(stage_data, latest_stage):
     
     return fig
 
-def create_riders_display(team_rosters):
-    """Create the team riders display with cards for each team"""
-    if not team_rosters:
-        st.error("No rider data available")
-        return
+def create_stage_heatmap_chart(names, splits, split_ranks, gc_order, metric="rank", gc_ranks=None):
+    """Create a full-race heatmap of stage splits, one row per participant sorted by GC position"""
+    # Reorder the precomputed matrix rows by GC position (leader first)
+    row_index = {name: row for row, name in enumerate(names)}
+    order = np.array([row_index[name] for name in gc_order if name in row_index], dtype=int)
+    labels = [names[row] for row in order]
+    splits = splits[order]
+    split_ranks = split_ranks[order]
+    
+    # Hover values travel as numeric customdata (rank, hours, minutes, seconds) instead of per-cell strings
+    customdata = np.dstack([np.nan_to_num(split_ranks).astype(int), hms_columns(splits)])
+    
+    if metric == "rank":
+        z = split_ranks
+        colorbar_title = 'Stage Rank'
+    elif metric == "gc":
+        z = gc_ranks[order]
+        colorbar_title = 'GC Position'
+    else:
+        z = splits / 60  # Convert to minutes
+        colorbar_title = 'Stage Time (Min)'
+    
+    fig = go.Figure(go.Heatmap(
+        z=z,
+        x=np.arange(1, splits.shape[1] + 1),
+        y=labels,
+        customdata=customdata,
+        colorscale='YlOrRd',
+        hoverongaps=False,
+        colorbar=dict(title=dict(text=colorbar_title, font=dict(color='#FFFFFF')), tickfont=dict(color='#FFFFFF')),
+        hovertemplate='<b>%{y}</b><br>Stage: %{x}<br>Stage Time: %{customdata[1]}:%{customdata[2]:02d}:%{customdata[3]:02d}<br>Stage Rank: %{customdata[0]}<extra></extra>'
+    ))
+    
+    # Dark theme styling; height grows with the field but stays bounded for large leagues
+    fig.update_layout(
+        title={
+            'text': 'Full Race Stage Heatmap',
+            'x': 0.5,
+            'font': {'size': 16, 'color': '#FFFFFF'}
+        },
+        xaxis_title='Stage',
+        plot_bgcolor='#1e1e1e',
+        paper_bgcolor='#1e1e1e',
+        font=dict(color='#FFFFFF', size=11),
+        xaxis=dict(
+            tickmode='linear',
+            dtick=1,
+            tickfont=dict(color='#FFFFFF', size=10),
+            title=dict(font=dict(color='#FFFFFF', size=12))
+        ),
+        yaxis=dict(
+            autorange='reversed',
+            showticklabels=len(labels) <= 60,
+            tickfont=dict(color='#FFFFFF', size=10)
+        ),
+        margin=dict(l=40, r=40, t=70, b=40),
+        height=max(350, min(1200, 80 + 20 * len(labels)))
+    )
+    
+    return fig
+
+def create_win_probability_chart(names, probabilities, gc_order):
+    """Create a heatmap of each participant's chance of finishing in each final position"""
+    row_index = {name: row for row, name in enumerate(names)}
+    order = np.array([row_index[name] for name in gc_order if name in row_index], dtype=int)
+    labels = [names[row] for row in order]
+    probabilities = probabilities[order]
+    
+    fig = go.Figure(go.Heatmap(
+        z=probabilities,
+        x=np.arange(1, probabilities.shape[1] + 1),
+        y=labels,
+        colorscale='YlOrRd',
+        zmin=0,
+        zmax=1,
+        texttemplate='%{z:.0%}' if len(labels) <= 20 else None,
+        colorbar=dict(title=dict(text='Probability', font=dict(color='#FFFFFF')), tickformat='.0%', tickfont=dict(color='#FFFFFF')),
+        hovertemplate='<b>%{y}</b><br>Final Position: %{x}<br>Probability: %{z:.1%}<extra></extra>'
+    ))
+    
+    # Dark theme styling
+    fig.update_layout(
+        title={
+            'text': 'Projected Final Positions',
+            'x': 0.5,
+            'font': {'size': 16, 'color': '#FFFFFF'}
+        },
+        xaxis_title='Final Position',
+        plot_bgcolor='#1e1e1e',
+        paper_bgcolor='#1e1e1e',
+        font=dict(color='#FFFFFF', size=11),
+        xaxis=dict(
+            tickmode='linear',
+            dtick=1 if len(labels) <= 30 else None,
+            tickfont=dict(color='#FFFFFF', size=10),
+            title=dict(font=dict(color='#FFFFFF', size=12))
+        ),
+        yaxis=dict(
+            autorange='reversed',
+            showticklabels=len(labels) <= 60,
+            tickfont=dict(color='#FFFFFF', size=10)
+        ),
+        margin=dict(l=40, r=40, t=70, b=40),
+        height=max(350, min(1200, 80 + 20 * len(labels)))
+    )
+    
+    return fig
+
+def create_head_to_head_chart(participant, rival, gap_series):
+    """Create chart of the time gap between two participants after each stage"""
+    fig = go.Figure()
     
+    stages = np.arange(1, len(gap_series) + 1)
+    present = ~np.isnan(gap_series)
+    gaps = gap_series[present]
+    
+    # Create custom hover text with exact gap times
+    hover_text = []
+    for stage, gap_seconds in zip(stages[present], gaps.astype(int)):
+        if gap_seconds > 0:
+            gap_str = f"{seconds_to_time_str(gap_seconds)} behind {rival}"
+        elif gap_seconds < 0:
+            gap_str = f"{seconds_to_time_str(-gap_seconds)} ahead of {rival}"
+        else:
+            gap_str = f"Level with {rival}"
+        hover_text.append(f'<b>{participant}</b><br>Stage: {stage}<br>{gap_str}')
+    
+    # Positive values mean the participant trails the rival
+    fig.add_trace(go.Scatter(
+        x=stages[present],
+        y=gaps / 60,  # Convert to minutes
+        mode='lines+markers',
+        name=f'{participant} vs {rival}',
+        fill='tozeroy',
+        line=dict(color='#FFD700', width=3),
+        marker=dict(size=8, color=np.where(gaps > 0, '#FF6B6B', '#96CEB4')),
+        hovertemplate='%{text}<extra></extra>',
+        text=hover_text
+    ))
+    
+    # Dark theme styling with mobile responsiveness
+    fig.update_layout(
+        title={
+            'text': f'{participant} vs {rival} (Minutes Behind)',
+            'x': 0.5,
+            'font': {'size': 16, 'color': '#FFFFFF'}
+        },
+        xaxis_title='Stage',
+        yaxis_title=f'Minutes Behind {rival}',
+        plot_bgcolor='#1e1e1e',
+        paper_bgcolor='#1e1e1e',
+        font=dict(color='#FFFFFF', size=11),
+        xaxis=dict(
+            gridcolor='#404040',
+            tickmode='linear',
+            dtick=1,
+            range=[0.5, len(gap_series) + 0.5],
+            tickfont=dict(color='#FFFFFF', size=10),
+            title=dict(font=dict(color='#FFFFFF', size=12))
+        ),
+        yaxis=dict(
+            gridcolor='#404040',
+            zerolinecolor='#FFFFFF',
+            tickfont=dict(color='#FFFFFF', size=10),
+            title=dict(font=dict(color='#FFFFFF', size=12))
+        ),
+        showlegend=False,
+        margin=dict(l=40, r=40, t=70, b=40),
+        height=350
+    )
+    
+    return fig
+
+@st.cache_resource(max_entries=SHARED_CACHE_ENTRIES, ttl=SHARED_CACHE_TTL)
+def get_roster_view(riders_token, _team_rosters):
+    """Build the grouped roster table and rider search index once per roster snapshot"""
+    return build_roster_view(_team_rosters)
+
+@st.cache_data(max_entries=256)
+def render_team_roster_html(riders_token, _roster_view, team):
+    """Build one team's roster card as a single HTML payload, once per roster snapshot"""
     # Color scheme for team cards (matching the existing chart colors)
     team_colors = {
         'Jeremy': '#FFD700',  # Gold
@@ -755,54 +1076,48 @@ def create_riders_display(team_rosters):
         'Aaron': '#45B7D1',   # Blue
         'Nate': '#96CEB4'     # Green
     }
+    color = team_colors.get(team, '#333333')
+    riders = team_roster(_roster_view, team)
+    rider_list = "".join(f"<li>{escape(rider)}</li>" for rider in riders) if riders else "<li style='list-style: none;'>No riders assigned</li>"
+    return (
+        f"<h3>🚴 {escape(team)}</h3>"
+        f"<div style='color: {color}; font-weight: bold; margin-bottom: 10px;'>{len(riders)} Riders</div>"
+        f"<ol style='color: #ffffff;'>{rider_list}</ol>"
+    )
+
+def create_riders_display(team_rosters, riders_token):
+    """Create the team riders display: a rider search, then a card for each team on show"""
+    if not team_rosters:
+        st.error("No rider data available")
+        return
     
-    st.markdown("### 👥 Team Rosters")
-    st.markdown("Current riders for each fantasy team in the Tour de France 2025")
+    roster_view = get_roster_view(riders_token, team_rosters)
+    teams = roster_view['teams']
     
-    # Create responsive team display - stack on mobile
-    # For mobile: show one team per row, for desktop: show multiple columns
-    teams_list = list(team_rosters.items())
+    st.markdown("### 👥 Team Rosters")
+    st.markdown(f"Current riders for each fantasy team in the {COMPETITION_CONFIG['competition_name']}")
     
-    # Use responsive columns that work better on mobile
-    if len(teams_list) <= 2:
-        cols = st.columns(len(teams_list))
-        display_teams = [teams_list]
+    query = st.text_input("🔎 Search riders", placeholder="Rider name, e.g. pogacar")
+    if query:
+        matches = search_roster(roster_view, query)
+        if matches.empty:
+            st.info(f"No rostered rider matches \"{query}\"")
+        else:
+            st.dataframe(matches, use_container_width=True, hide_index=True)
     else:
-        # Split teams into rows of 2-3 for mobile compatibility
-        cols1 = st.columns(2)
-        cols2 = st.columns(2) if len(teams_list) > 2 else None
-        cols3 = st.columns(1) if len(teams_list) == 5 else None
-        
-        display_teams = [teams_list[:2]]
-        if len(teams_list) > 2:
-            display_teams.append(teams_list[2:4])
-        if len(teams_list) == 5:
-            display_teams.append([teams_list[4]])
-    
-    team_idx = 0
-    for row_teams in display_teams:
-        if len(row_teams) == 1:
-            cols = st.columns(1)
+        # Cards are only built for the teams on show; big leagues pick which ones to open
+        if len(teams) > MAX_ROSTER_CARDS:
+            shown = st.multiselect("Show teams:", teams, default=teams[:MAX_ROSTER_CARDS])
         else:
-            cols = st.columns(len(row_teams))
-            
-        for col_idx, (team_owner, riders) in enumerate(row_teams):
-            with cols[col_idx]:
-                # Get team color
-                color = team_colors.get(team_owner, '#333333')
-                
-                # Display team header
-                st.markdown(f"### 🚴 {team_owner}")
-                st.markdown(f"<div style='color: {color}; font-weight: bold; margin-bottom: 10px;'>{len(riders)} Riders</div>", unsafe_allow_html=True)
-                
-                # Display riders as a simple list
-                if riders:
-                    for i, rider in enumerate(riders, 1):
-                        st.write(f"{i}. {rider}")
-                else:
-                    st.write("No riders assigned")
-                
-                st.markdown("---")
+            shown = teams
+        # Two cards per row stacks cleanly on mobile
+        for row_start in range(0, len(shown), 2):
+            row_teams = shown[row_start:row_start + 2]
+            cols = st.columns(2)
+            for col, team in zip(cols, row_teams):
+                with col:
+                    st.markdown(render_team_roster_html(riders_token, roster_view, team), unsafe_allow_html=True)
+                    st.markdown("---")
     
     # Add summary statistics
     st.markdown("---")
@@ -821,6 +1136,323 @@ def create_riders_display(team_rosters):
     # Average on its own row for mobile readability
     st.metric("Average per Team", f"{avg_riders:.1f}")
 
+def create_team_overlap_chart(teams, overlap):
+    """Create a heatmap of roster similarity (shared riders / combined riders) between teams"""
+    fig = go.Figure(go.Heatmap(
+        z=overlap,
+        x=teams,
+        y=teams,
+        colorscale='YlOrRd',
+        zmin=0,
+        zmax=1,
+        texttemplate='%{z:.0%}' if len(teams) <= 15 else None,
+        colorbar=dict(title=dict(text='Overlap', font=dict(color='#FFFFFF')), tickformat='.0%', tickfont=dict(color='#FFFFFF')),
+        hovertemplate='<b>%{y}</b> vs <b>%{x}</b><br>Roster Overlap: %{z:.0%}<extra></extra>'
+    ))
+    
+    # Dark theme styling
+    fig.update_layout(
+        title={
+            'text': 'Team Roster Overlap',
+            'x': 0.5,
+            'font': {'size': 16, 'color': '#FFFFFF'}
+        },
+        plot_bgcolor='#1e1e1e',
+        paper_bgcolor='#1e1e1e',
+        font=dict(color='#FFFFFF', size=11),
+        xaxis=dict(tickfont=dict(color='#FFFFFF', size=10)),
+        yaxis=dict(autorange='reversed', tickfont=dict(color='#FFFFFF', size=10)),
+        margin=dict(l=40, r=40, t=70, b=40),
+        height=max(350, min(900, 80 + 25 * len(teams)))
+    )
+    
+    return fig
+
+def create_ownership_display(roster_index):
+    """Create the rider ownership table and team overlap view"""
+    teams = roster_index['teams']
+    riders = roster_index['riders']
+    if not riders:
+        return
+    
+    teams_owning, ownership_share = rider_ownership(roster_index)
+    
+    st.markdown("### 📈 Rider Ownership")
+    st.markdown("How many fantasy teams picked each rider")
+    
+    ownership = pd.DataFrame({
+        'Rider': riders,
+        'Teams': teams_owning,
+        'Ownership': [f"{share:.0%}" for share in ownership_share]
+    })
+    # Owner names only fit in the table for small leagues
+    if len(teams) <= 20:
+        ownership['Owned By'] = [
+            ", ".join(teams[row] for row in roster_index['rider_teams'][rider])
+            for rider in riders
+        ]
+    ownership = ownership.sort_values(['Teams', 'Rider'], ascending=[False, True])
+    st.dataframe(ownership, use_container_width=True, hide_index=True)
+    
+    st.markdown("### 🔗 Team Overlap")
+    overlap = roster_index['overlap']
+    if len(teams) <= 50:
+        st.plotly_chart(create_team_overlap_chart(teams, overlap), use_container_width=True)
+    else:
+        # Too many teams for a readable matrix: show the closest rosters for one team
+        team = st.selectbox("Compare roster of:", teams)
+        row = teams.index(team)
+        similar = np.argsort(-overlap[row], kind='stable')
+        similar = similar[similar != row][:10]
+        st.dataframe(
+            pd.DataFrame({
+                'Team': [teams[other] for other in similar],
+                'Overlap': [f"{overlap[row, other]:.0%}" for other in similar]
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+    st.markdown('<p class="analysis-text" style="color: #ffffff !important; font-weight: bold;">Analysis:</p><p class="analysis-description" style="color: #e0e0e0 !important;">Overlap is the share of riders two teams have in common out of all riders on either roster.</p>', unsafe_allow_html=True)
+
+def create_results_matching_display(team_rosters):
+    """Match roster rider names against an uploaded official results file"""
+    results_file = st.file_uploader("Official results (CSV)", type=["csv"])
+    if results_file is None:
+        st.markdown('<p style="color: #e0e0e0;">Upload a results file to line up each team\'s riders with their official results. Names are matched regardless of accents, capitalisation and name order.</p>', unsafe_allow_html=True)
+        return
+    
+    try:
+        results_df = pd.read_csv(results_file)
+        results_df.columns = results_df.columns.str.strip()
+    except Exception as e:
+        st.error(f"Error reading results file: {str(e)}")
+        return
+    
+    columns = list(results_df.columns)
+    rider_column = st.selectbox("Rider name column:", columns, index=columns.index('Rider') if 'Rider' in columns else 0)
+    matches, unmatched = join_rosters_to_results(team_rosters, results_df, rider_column)
+    
+    st.dataframe(matches, use_container_width=True, hide_index=True)
+    if unmatched:
+        st.warning(f"{len(unmatched)} roster names could not be matched: {', '.join(unmatched)}")
+    else:
+        st.success("All roster names matched")
+
+def format_change_event(event):
+    """One line of the change feed"""
+    if event['type'] == 'stage':
+        return f"🏁 Stage {event['stage']} results are in ({event['participants']} participants)"
+    if event['type'] == 'position':
+        arrow = "⬆️" if event['to'] < event['from'] else "⬇️"
+        return f"{arrow} {event['participant']} moved from {event['from']} to {event['to']}"
+    if event['type'] == 'leader':
+        return f"🟡 {event['participant']} takes the lead"
+    if event['type'] == 'gap':
+        verb = "gained" if event['change'] < 0 else "lost"
+        return f"⏱️ {event['participant']} {verb} {seconds_to_time_str(abs(event['change']))} on the leader"
+    return f"🆕 {event['participant']} joined in position {event['to']}"
+
+def position_change_badges(events):
+    """Net position change per participant over a run of events, as small ▲/▼ badges for the standings rows"""
+    first_position = {}
+    last_position = {}
+    for event in events:
+        if event['type'] == 'position':
+            first_position.setdefault(event['participant'], event['from'])
+            last_position[event['participant']] = event['to']
+    badges = {}
+    for participant, position in last_position.items():
+        change = first_position[participant] - position
+        if change:
+            color = "#4ECDC4" if change > 0 else "#FF6B6B"
+            badges[participant] = f' <span style="font-size: 14px; color: {color};">{"▲" if change > 0 else "▼"}{abs(change)}</span>'
+    return badges
+
+@st.cache_data(max_entries=16)
+def render_standings_html(_sorted_participants, data_token, is_complete, movement):
+    """Build the standings cards as a single HTML payload, once per data change token and set of movement badges"""
+    leader_label = "🏆 CHAMPION" if is_complete else "👑 LEADER"
+    last_position = _sorted_participants[-1][1]['position']
+    cards = []
+    for participant, data in _sorted_participants:
+        position = data['position']
+        name = escape(participant) + movement.get(participant, "")
+        time_str = escape(str(data['time']))
+        if position == 1:
+            cards.append(f"""
+            <div class="dark-leader-card" style="background-color: #FFD700; padding: 15px; border-radius: 8px; margin: 8px 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+                <div style="display: flex; justify-content: space-between; align-items: center;">
+                    <span style="font-size: 24px; font-weight: bold; color: #000000;">🥇 {position}. {name}</span>
+                    <span style="font-size: 20px; font-weight: bold; color: #000000;">{time_str}</span>
+                    <span style="font-size: 18px; color: #B8860B; font-weight: bold;">{leader_label}</span>
+                </div>
+            </div>""")
+            continue
+        if position == last_position:
+            # Last place gets sad panda
+            medal = f"{position}. 🐼"
+        elif position == 2:
+            medal = "🥈"
+        elif position == 3:
+            medal = "🥉"
+        else:
+            medal = f"{position}."
+        cards.append(f"""
+            <div class="dark-card" style="background-color: #2d2d2d; padding: 15px; border-radius: 8px; margin: 8px 0; border: 2px solid #404040; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
+                <div style="display: flex; justify-content: space-between; align-items: center;">
+                    <span style="font-size: 22px; font-weight: bold; color: #ffffff;">{medal} {name}</span>
+                    <span style="font-size: 18px; font-weight: 600; color: #e0e0e0;">{time_str}</span>
+                    <span style="font-size: 16px; color: #ff6b6b; font-weight: 600;">{escape(data['gap'])}</span>
+                </div>
+            </div>""")
+    return "".join(cards)
+
+def create_change_feed_display(feed, seen_sequence, limit=15):
+    """Create the "what changed" panel; events since this session last looked are marked as new"""
+    events = feed.recent(limit)
+    new_count = sum(event['sequence'] > seen_sequence for event in events)
+    label = f"🔔 What Changed ({new_count} new)" if new_count else "🔔 What Changed"
+    with st.expander(label, expanded=new_count > 0):
+        if not events:
+            st.markdown('<p style="color: #e0e0e0;">No changes since the app started. Moves show up here as the standings update.</p>', unsafe_allow_html=True)
+            return
+        lines = []
+        for event in events:
+            recorded = datetime.fromtimestamp(event['recorded_at']).strftime('%H:%M')
+            text = escape(format_change_event(event))
+            if event['sequence'] > seen_sequence:
+                text = f"<b>{text}</b>"
+            lines.append(f'<div style="color: #e0e0e0; padding: 2px 0;"><span style="color: #888;">{recorded}</span> {text}</div>')
+        st.markdown("".join(lines), unsafe_allow_html=True)
+
+def create_classification_table(names, positions, columns, note):
+    """Show one classification as a table of ranked participants (unranked ones left out)"""
+    ranked = np.flatnonzero(~np.isnan(positions))
+    ranked = ranked[np.argsort(positions[ranked], kind='stable')]
+    table = pd.DataFrame({'Position': positions[ranked].astype(int), 'Participant': [names[row] for row in ranked]})
+    for label, values in columns.items():
+        table[label] = [values[row] for row in ranked]
+    st.dataframe(table, use_container_width=True, hide_index=True)
+    st.markdown(f'<p class="analysis-description" style="color: #e0e0e0 !important;">{note}</p>', unsafe_allow_html=True)
+
+def create_classifications_display(names, results):
+    """Create the secondary classification tables (stage wins, points, consistency, recent form)"""
+    st.markdown("### 🏅 Other Classifications")
+    wins_tab, points_tab, consistency_tab, form_tab = st.tabs(
+        ["🏁 Stage Wins", "🟢 Points", "📏 Most Consistent", f"🔥 Last {FORM_STAGES} Stages"]
+    )
+    
+    with wins_tab:
+        create_classification_table(names, results['stage_wins_position'], {'Stage Wins': results['stage_wins']}, "Fastest split on a stage; a shared fastest time counts as a win for each.")
+    with points_tab:
+        create_classification_table(names, results['points_position'], {'Points': results['points']}, "Points for every stage placing, from 50 for 1st down to 2 for 15th.")
+    with consistency_tab:
+        create_classification_table(
+            names,
+            results['consistency_position'],
+            {'Spread': [seconds_to_time_str(int(round(value))) if not np.isnan(value) else "" for value in results['consistency']]},
+            "Typical distance from the field's median split on each stage; smaller is steadier. Needs at least two stages."
+        )
+    with form_tab:
+        create_classification_table(
+            names,
+            results['form_position'],
+            {f'Last {FORM_STAGES} Stages': [seconds_to_time_str(int(value)) if not np.isnan(value) else "" for value in results['form']]},
+            f"Combined split time over the last {FORM_STAGES} completed stages."
+        )
+
+def create_season_history_chart(history):
+    """Create a line chart of each participant's finishing position across seasons"""
+    fig = go.Figure()
+    
+    # Color scheme for participants
+    colors = {
+        'Jeremy': '#FFD700',
+        'Leo': '#FF6B6B',
+        'Charles': '#4ECDC4', 
+        'Aaron': '#45B7D1',
+        'Nate': '#96CEB4'
+    }
+    
+    seasons = [str(season) for season in history.columns]
+    for participant, positions in history.iterrows():
+        fig.add_trace(go.Scatter(
+            x=seasons,
+            y=positions.astype(float).to_numpy(),
+            mode='lines+markers',
+            name=participant,
+            connectgaps=False,
+            line=dict(color=colors.get(participant, '#FFFFFF'), width=3),
+            marker=dict(size=10, color=colors.get(participant, '#FFFFFF')),
+            hovertemplate=f'<b>{participant}</b><br>Season: %{{x}}<br>Final Position: %{{y}}<extra></extra>'
+        ))
+    
+    # Dark theme styling
+    fig.update_layout(
+        title={
+            'text': 'Finishing Position by Season',
+            'x': 0.5,
+            'font': {'size': 16, 'color': '#FFFFFF'}
+        },
+        xaxis_title='Season',
+        yaxis_title='Final Position',
+        plot_bgcolor='#1e1e1e',
+        paper_bgcolor='#1e1e1e',
+        font=dict(color='#FFFFFF', size=12),
+        xaxis=dict(type='category', gridcolor='#404040', tickfont=dict(color='#FFFFFF')),
+        yaxis=dict(autorange='reversed', dtick=1, gridcolor='#404040', tickfont=dict(color='#FFFFFF')),
+        legend=dict(font=dict(color='#FFFFFF')),
+        margin=dict(l=40, r=40, t=70, b=40),
+        height=450
+    )
+    
+    return fig
+
+def create_season_archive_display(archive):
+    """Create the past seasons view: cross-season history from summaries, one season's stages on demand"""
+    seasons = archive.seasons()
+    if not seasons:
+        st.info("📚 No seasons archived yet. The current season is archived as stage results come in.")
+        return
+    
+    st.markdown("### 📚 Season Archive")
+    summaries = archive.summaries()
+    provisional = set(summaries.loc[~summaries['complete'], 'season'].tolist())
+    # A season still in progress shows its current positions, labelled as such
+    history = archive.participant_history().rename(
+        columns=lambda season: f"{season} (provisional)" if season in provisional else str(season)
+    )
+    if len(seasons) > 1 and len(history) <= LARGE_FIELD_THRESHOLD:
+        st.plotly_chart(create_season_history_chart(history), use_container_width=True)
+    st.dataframe(
+        history.rename_axis('Participant').reset_index(),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    season = st.selectbox("Season:", seasons, format_func=lambda season: f"{season} (in progress)" if season in provisional else str(season))
+    summary = summaries[summaries['season'] == season]
+    if season in provisional:
+        st.caption("⏳ Season in progress: positions are provisional until the final stage is in.")
+    st.dataframe(
+        pd.DataFrame({
+            'Position': summary['final_position'],
+            'Participant': summary['participant'],
+            'Time': [seconds_to_time_str(int(t)) if pd.notna(t) else "" for t in summary['final_time_seconds']],
+            'Gap': [calculate_time_gap(0, int(g)) if pd.notna(g) else "" for g in summary['gap_seconds']],
+            'Stage Wins': summary['stage_wins'],
+            'Stages': summary['stages_completed']
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    # The full stage table is only read from disk when asked for
+    if st.toggle("Show stage-by-stage progression", key=f"season_stages_{season}"):
+        table = archive.season(season)
+        last_stage = int(summary['last_stage'].max())
+        st.plotly_chart(create_cumulative_time_chart(table, last_stage), use_container_width=True, key=f"season_chart_{season}")
+
 def get_dark_theme_css():
     """Return dark theme CSS with animated transitions"""
     return """
@@ -1412,85 +2044,62 @@ def main():
             st.cache_data.clear()
             st.rerun()
     
-    # Fetch and process data
-    with st.spinner("Fetching latest standings..."):
-        df = fetch_data()
-        riders_df = fetch_riders_data()
-        processed_data = process_data(df)
-        team_rosters = process_riders_data(riders_df)
+    # Fetch and process data; right after a restart the saved snapshot is shown while upstream is revalidated
+    warm_start = get_warm_start()
+    serving_snapshot = warm_start.serving_snapshot()
+    if serving_snapshot:
+        data = warm_start.snapshot
+    else:
+        with st.spinner("Fetching latest standings..."):
+            warm_start.refreshed.wait()  # First start without a snapshot: let the background fetch finish
+            data = load_current_data()
+        warm_start.save(data)
+    processed_data = data['processed_data']
+    team_rosters = data['team_rosters']
+    data_status, riders_status = data['data_status'], data['riders_status']
     
     if processed_data is None:
         st.error("Unable to load standings data. Please check the Google Sheets connection.")
         return
     
     sorted_participants, latest_stage, stage_by_stage_data = processed_data
+    share_content = generate_share_content(sorted_participants, latest_stage)
+    card_hash = get_share_card_hash(sorted_participants, latest_stage)
+    create_share_meta_tags(share_content, card_hash)
+    create_stale_data_badge(data_status, riders_status)
+    if serving_snapshot:
+        saved_at = datetime.fromtimestamp(data_status['fetched_at']).strftime('%Y-%m-%d %H:%M')
+        st.caption(f"⏳ Showing saved standings from {saved_at} while the latest data loads...")
+        rerun_when_refreshed(warm_start)
     
     # Create main navigation tabs
-    tab1, tab2, tab3 = st.tabs(["🏆 Current Standings", "📊 Stage Analysis", "👥 Team Riders"])
+    tab1, tab2, tab3, tab4 = st.tabs(["🏆 Current Standings", "📊 Stage Analysis", "👥 Team Riders", "📚 Past Seasons"])
     
     with tab1:
         # Create standings table - moved to top
-        st.markdown("### 🏆 Current Standings")
+        # Change feed: events since this session's last look drive the panel and the row badges
+        change_feed = get_change_feed()
+        events = change_feed.record(data['data_token'], processed_data)
+        notifier = get_notifier()
+        if notifier and events:
+            # Only enqueues: delivery happens on the notifier's own thread
+            notifier.submit(notifications_from_events(events, leader=processed_data[0][0][0]))
+        if st.session_state.get('feed_token') != data['data_token']:
+            # New data for this session: everything after what it saw last stays "new" until the next update
+            st.session_state['feed_since'] = st.session_state.get('feed_seen', change_feed.sequence)
+            st.session_state['feed_token'] = data['data_token']
+        st.session_state['feed_seen'] = change_feed.sequence
+        seen_sequence = st.session_state['feed_since']
+        create_change_feed_display(change_feed, seen_sequence)
+        movement = position_change_badges(change_feed.since(seen_sequence))
         
-        # Custom CSS for Tour de France styling
-        st.markdown("""
-        <style>
-        .leader-row {
-            background-color: #FFD700 !important;
-            font-weight: bold;
-        }
-        .standings-table {
-            font-size: 16px;
-        }
-        </style>
-        """, unsafe_allow_html=True)
+        st.markdown("### 🏆 Current Standings")
         
-        # Display standings
-        for i, (participant, data) in enumerate(sorted_participants):
-            position = data['position']
-            time_str = data['time']
-            gap = data['gap']
-            
-            # Create columns for the display
-            pos_col, name_col, time_col, gap_col = st.columns([1, 3, 2, 2])
-            
-            # Apply yellow background for leader
-            if position == 1:
-                # Dynamic label based on competition status
-                leader_label = "🏆 CHAMPION" if COMPETITION_CONFIG["is_complete"] else "👑 LEADER"
-                container = st.container()
-                with container:
-                    st.markdown(f"""
-                    <div class="dark-leader-card" style="background-color: #FFD700; padding: 15px; border-radius: 8px; margin: 8px 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                        <div style="display: flex; justify-content: space-between; align-items: center;">
-                            <span style="font-size: 24px; font-weight: bold; color: #000000;">🥇 {position}. {participant}</span>
-                            <span style="font-size: 20px; font-weight: bold; color: #000000;">{time_str}</span>
-                            <span style="font-size: 18px; color: #B8860B; font-weight: bold;">{leader_label}</span>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-            else:
-                # Regular participant display
-                total_participants = len(sorted_participants)
-                if position == total_participants:
-                    # Last place gets sad panda
-                    medal = f"{position}. 🐼"
-                elif position == 2:
-                    medal = "🥈"
-                elif position == 3:
-                    medal = "🥉"
-                else:
-                    medal = f"{position}."
-                
-                st.markdown(f"""
-                <div class="dark-card" style="background-color: #2d2d2d; padding: 15px; border-radius: 8px; margin: 8px 0; border: 2px solid #404040; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
-                    <div style="display: flex; justify-content: space-between; align-items: center;">
-                        <span style="font-size: 22px; font-weight: bold; color: #ffffff;">{medal} {participant}</span>
-                        <span style="font-size: 18px; font-weight: 600; color: #e0e0e0;">{time_str}</span>
-                        <span style="font-size: 16px; color: #ff6b6b; font-weight: 600;">{gap}</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+        # Whole standings block as one cached payload: one element per rerun instead of one per participant
+        st.markdown(
+            render_standings_html(sorted_participants, data['data_token'], COMPETITION_CONFIG["is_complete"], movement),
+            unsafe_allow_html=True
+        )
         
         # Additional information with mobile-responsive layout
         st.markdown("---")
@@ -1513,6 +2122,10 @@ def main():
             else:
                 st.metric("Gap to 2nd Place", "N/A")
         
+        # Secondary classifications (cached per snapshot, so switching tabs costs nothing)
+        st.markdown("---")
+        create_classifications_display(*get_classifications(stage_by_stage_data, latest_stage))
+        
         # Stage Progress Visualization (moved below standings)
         st.markdown("---")
         st.info(f"📊 Current standings after Stage {latest_stage}")
@@ -1553,7 +2166,7 @@ def main():
         
         # Footer
         st.markdown("---")
-        st.markdown(f"*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Data refreshes every 5 minutes*")
+        st.markdown(f"*Last updated: {datetime.fromtimestamp(data_status['fetched_at']).strftime('%Y-%m-%d %H:%M:%S')} | Data refreshes every 5 minutes*")
         st.markdown("*🟡 Yellow highlight indicates the current General Classification leader*")
     
     with tab2:
@@ -1567,30 +2180,102 @@ def main():
                 [
                     "🏁 Cumulative Time Progression",
                     "⚡ Individual Stage Performance", 
-                    "📈 Gap Evolution from Leader"
+                    "📈 Gap Evolution from Leader",
+                    "🔥 Full Race Heatmap",
+                    "🎲 Win Probability",
+                    "🤝 Head-to-Head"
                 ]
             )
             
+            # Large fields only draw the top teams individually; let users pin extra teams
+            focus_teams = None
+            if len(stage_by_stage_data) > LARGE_FIELD_THRESHOLD and chart_option in ("🏁 Cumulative Time Progression", "📈 Gap Evolution from Leader"):
+                focus_teams = st.multiselect(
+                    f"Highlight teams (top {LARGE_FIELD_TOP_N} shown, rest grouped as a percentile band):",
+                    [participant for participant, _ in sorted_participants]
+                )
+            
             if chart_option == "🏁 Cumulative Time Progression":
                 st.plotly_chart(
-                    create_cumulative_time_chart(stage_by_stage_data, latest_stage),
+                    create_cumulative_time_chart(stage_by_stage_data, latest_stage, focus_teams),
                     use_container_width=True
                 )
                 st.markdown('<p class="analysis-text" style="color: #ffffff !important; font-weight: bold;">Analysis:</p><p class="analysis-description" style="color: #e0e0e0 !important;">Shows each participant\'s total cumulative time progression across all completed stages.</p>', unsafe_allow_html=True)
                 
             elif chart_option == "⚡ Individual Stage Performance":
+                create_stage_performance_display(stage_by_stage_data, latest_stage)
+                
+            elif chart_option == "📈 Gap Evolution from Leader":
+                reference = st.selectbox(
+                    "Measure gaps against:",
+                    ["Stage leader"] + [participant for participant, _ in sorted_participants]
+                )
+                reference = None if reference == "Stage leader" else reference
                 st.plotly_chart(
-                    create_stage_performance_chart(stage_by_stage_data, latest_stage),
+                    get_gap_evolution_chart(stage_by_stage_data, latest_stage, focus_teams, reference),
                     use_container_width=True
                 )
-                st.markdown('<p class="analysis-text" style="color: #ffffff !important; font-weight: bold;">Analysis:</p><p class="analysis-description" style="color: #e0e0e0 !important;">Displays individual stage times to identify stage winners and performance patterns.</p>', unsafe_allow_html=True)
-                
-            elif chart_option == "📈 Gap Evolution from Leader":
+                st.markdown('<p class="analysis-text" style="color: #ffffff !important; font-weight: bold;">Analysis:</p><p class="analysis-description" style="color: #e0e0e0 !important;">Tracks how time gaps to the leader of each stage, or to the chosen team, evolve over stages. Negative gaps mean ahead of the chosen team.</p>', unsafe_allow_html=True)
+            
+            elif chart_option == "🔥 Full Race Heatmap":
+                heatmap_metric = st.radio("Color by:", ["Stage Rank", "GC Position", "Stage Time"], horizontal=True)
+                names, splits, split_ranks = get_split_matrix(stage_by_stage_data, COMPETITION_CONFIG["total_stages"])
+                _, gc_ranks = get_gc_rank_matrix(stage_by_stage_data, COMPETITION_CONFIG["total_stages"])
                 st.plotly_chart(
-                    create_gap_evolution_chart(stage_by_stage_data, latest_stage),
+                    create_stage_heatmap_chart(
+                        names,
+                        splits,
+                        split_ranks,
+                        [participant for participant, _ in sorted_participants],
+                        metric={"Stage Rank": "rank", "GC Position": "gc"}.get(heatmap_metric, "time"),
+                        gc_ranks=gc_ranks
+                    ),
                     use_container_width=True
                 )
-                st.markdown('<p class="analysis-text" style="color: #ffffff !important; font-weight: bold;">Analysis:</p><p class="analysis-description" style="color: #e0e0e0 !important;">Tracks how time gaps between participants and the leader evolve over stages.</p>', unsafe_allow_html=True)
+                st.markdown('<p class="analysis-text" style="color: #ffffff !important; font-weight: bold;">Analysis:</p><p class="analysis-description" style="color: #e0e0e0 !important;">Shows every participant\'s split on every stage of the race, sorted by GC position. Darker cells are slower stages.</p>', unsafe_allow_html=True)
+            
+            elif chart_option == "🎲 Win Probability":
+                total_stages = COMPETITION_CONFIG["total_stages"]
+                if COMPETITION_CONFIG["is_complete"] or latest_stage >= total_stages:
+                    st.info("🏁 All stages are complete - the final positions are settled.")
+                else:
+                    names, probabilities = get_win_probabilities(stage_by_stage_data, latest_stage, total_stages)
+                    st.plotly_chart(
+                        create_win_probability_chart(names, probabilities, [participant for participant, _ in sorted_participants]),
+                        use_container_width=True
+                    )
+                    st.markdown(f'<p class="analysis-text" style="color: #ffffff !important; font-weight: bold;">Analysis:</p><p class="analysis-description" style="color: #e0e0e0 !important;">Simulates the remaining {total_stages - latest_stage} stages 100,000 times by replaying completed stages, and shows how often each participant finished in each position.</p>', unsafe_allow_html=True)
+            
+            elif chart_option == "🤝 Head-to-Head":
+                row_index, gap_tensor = get_head_to_head_tensor(stage_by_stage_data, latest_stage)
+                gc_names = [participant for participant, _ in sorted_participants]
+                col1, col2 = st.columns(2)
+                with col1:
+                    participant = st.selectbox("Participant:", gc_names, index=min(1, len(gc_names) - 1))
+                with col2:
+                    rival = st.selectbox("Compared to:", gc_names, index=0)
+                
+                # O(stages) slice of the cached tensor
+                gap_series = gap_tensor[row_index[participant], row_index[rival]]
+                if participant == rival:
+                    st.info("Select two different participants to compare.")
+                else:
+                    st.plotly_chart(
+                        create_head_to_head_chart(participant, rival, gap_series),
+                        use_container_width=True
+                    )
+                    
+                    known_gaps = gap_series[~np.isnan(gap_series)]
+                    changes = lead_changes(gap_series)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        current_gap = int(known_gaps[-1]) if len(known_gaps) else 0
+                        st.metric(f"Gap to {rival}", calculate_time_gap(0, current_gap) if current_gap >= 0 else f"-{seconds_to_time_str(-current_gap)}")
+                    with col2:
+                        st.metric("Lead Changes", len(changes))
+                    if len(changes):
+                        st.markdown(f'<p class="analysis-description" style="color: #e0e0e0 !important;">Lead last changed hands after Stage {changes[-1]}.</p>', unsafe_allow_html=True)
+                st.markdown('<p class="analysis-text" style="color: #ffffff !important; font-weight: bold;">Analysis:</p><p class="analysis-description" style="color: #e0e0e0 !important;">Shows how far one participant is behind (above zero) or ahead of (below zero) another after every stage.</p>', unsafe_allow_html=True)
         
         else:
             st.info("📊 Stage analysis will be available once multiple stages are completed.")
@@ -1599,14 +2284,24 @@ def main():
     with tab3:
         # Team Riders Display
         if team_rosters:
-            create_riders_display(team_rosters)
+            create_riders_display(team_rosters, data['riders_token'])
+            st.markdown("---")
+            create_ownership_display(get_roster_index(team_rosters))
+            with st.expander("🔎 Match Riders to Official Results", expanded=False):
+                create_results_matching_display(team_rosters)
         else:
             st.error("Unable to load rider roster data. Please check the Google Sheets connection.")
     
+    with tab4:
+        create_season_archive_display(get_season_archive())
+    
     # Add sharing section at the bottom of the application
     st.markdown("---")  # Add separator line
+    with st.expander("⬇️ Download Data", expanded=False):
+        # The data change token identifies the whole sheet (every stage), unlike the share-card hash
+        create_export_display(processed_data, team_rosters, (data['data_token'], data['riders_token']))
     with st.expander("📱 Share This App", expanded=False):
-        create_sharing_buttons()
+        create_sharing_buttons(share_content, card_hash)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,124 @@
+"""Compute standings and analytics for one or more league sheets without Streamlit.
+
+Reads sheet files or URLs (any source ``data_sources.source_from_uri`` accepts)
+and writes the standings with secondary classifications, or the per-stage GC
+rank matrix, as JSON, CSV or Parquet:
+
+    python cli.py league.csv
+    python cli.py leagues/*.csv --format parquet --output standings.parquet --workers 8
+    python cli.py https://.../export?format=csv --table gc-ranks --format csv
+"""
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+import core
+from data_sources import source_from_uri
+from league_refresh import RefreshScheduler
+
+FORMATS = ("json", "csv", "parquet")
+TABLES = ("standings", "gc-ranks")
+
+
+def summarize_league(uri, participants=None):
+    """Fetch and process one league; returns its tables, or the error message if it failed"""
+    try:
+        df, _ = source_from_uri(uri).fetch()
+        processed_data = core.process_data(df, participants)
+    except (core.StandingsError, OSError, ValueError) as e:
+        return {'source': uri, 'error': str(e)}
+    except Exception as e:
+        # Anything else (e.g. sqlite3.OperationalError for a missing table) fails this league only
+        return {'source': uri, 'error': f"{type(e).__name__}: {e}"}
+    return league_tables(uri, processed_data)
+
+def league_tables(uri, processed_data):
+    """The output tables for one processed league"""
+    return {
+        'source': uri,
+        'latest_stage': processed_data[1],
+        'standings': core.standings_frame(processed_data),
+        'gc_ranks': core.gc_rank_frame(processed_data).reset_index()
+    }
+
+def summarize_leagues(uris, participants=None, workers=1):
+    """Process every league, on a ``RefreshScheduler`` pool when ``workers`` > 1 (results keep input order)"""
+    if workers <= 1 or len(uris) <= 1:
+        return [summarize_league(uri, participants) for uri in uris]
+    scheduler = RefreshScheduler(uris, participants, workers)
+    try:
+        scheduler.refresh()
+    finally:
+        scheduler.close()
+    results = []
+    for uri in uris:
+        processed_data = scheduler.processed_data(uri)
+        if processed_data is None:
+            results.append({'source': uri, 'error': scheduler.errors.get(uri, "no data")})
+        else:
+            results.append(league_tables(uri, processed_data))
+    return results
+
+def combined_table(results, table):
+    """One table across leagues, with a leading ``league`` column"""
+    key = 'standings' if table == "standings" else 'gc_ranks'
+    frames = [result[key].assign(league=result['source']) for result in results]
+    if not frames:
+        return pd.DataFrame()
+    combined = pd.concat(frames, ignore_index=True)
+    return combined[['league'] + [column for column in combined.columns if column != 'league']]
+
+def to_json(results):
+    """JSON document per league: latest stage, standings rows and GC ranks by participant"""
+    return [
+        {
+            'source': result['source'],
+            'latest_stage': result['latest_stage'],
+            'standings': json.loads(result['standings'].to_json(orient='records')),
+            'gc_ranks': json.loads(result['gc_ranks'].set_index('participant').to_json(orient='index'))
+        }
+        for result in results
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute fantasy standings and analytics from league sheets")
+    parser.add_argument("sources", nargs="+", help="Sheet files (.csv, .parquet, .db#table) or CSV export URLs")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="Output format (default: json)")
+    parser.add_argument("--table", choices=TABLES, default="standings", help="Table written for csv/parquet (default: standings)")
+    parser.add_argument("--output", help="Output file (default: stdout; required for parquet)")
+    parser.add_argument("--participants", help="Comma-separated participant names (default: every named row with times)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: one per CPU, capped at the number of sources)")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not args.output:
+        parser.error("--format parquet needs --output")
+    participants = [name.strip() for name in args.participants.split(",")] if args.participants else None
+    workers = args.workers or min(len(args.sources), os.cpu_count() or 1)
+
+    results = summarize_leagues(args.sources, participants, workers)
+    failed = [result for result in results if 'error' in result]
+    for result in failed:
+        print(f"{result['source']}: {result['error']}", file=sys.stderr)
+    results = [result for result in results if 'error' not in result]
+
+    if args.format == "json":
+        payload = to_json(results)
+        text = json.dumps(payload[0] if len(args.sources) == 1 and payload else payload, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+    elif args.format == "csv":
+        combined_table(results, args.table).to_csv(args.output or sys.stdout, index=False)
+    else:
+        combined_table(results, args.table).to_parquet(args.output, index=False)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
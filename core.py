@@ -0,0 +1,188 @@
+"""Standings processing without Streamlit.
+
+Everything here turns a sheet-shaped DataFrame into standings and analytics
+using only pandas and numpy, so it can run in the app, in ``replay.py`` and in
+the batch CLI (``cli.py``) alike. Problems are raised as ``StandingsError``;
+the app turns them into ``st.error`` messages.
+"""
+import numpy as np
+import pandas as pd
+
+from analytics import build_stage_matrix, split_matrix, rank_columns, standings_ranks, gc_rank_matrix, classifications
+from sheet_layout import find_layout, layout_first_row
+from stage_table import StageTable, format_stage_time
+
+PARTICIPANTS = ['Jeremy', 'Leo', 'Charles', 'Aaron', 'Nate']
+
+
+class StandingsError(ValueError):
+    """The sheet could not be turned into standings"""
+
+
+def time_to_seconds(time_str):
+    """Convert time string (H:MM:SS) to seconds for comparison"""
+    try:
+        if pd.isna(time_str) or time_str == "0:00:00" or time_str == "":
+            return 0
+        parts = str(time_str).split(':')
+        hours = int(parts[0])
+        minutes = int(parts[1])
+        seconds = int(parts[2])
+        return hours * 3600 + minutes * 60 + seconds
+    except:
+        return 0
+
+def seconds_to_time_str(seconds):
+    """Convert seconds back to time string format"""
+    return format_stage_time(seconds)
+
+def calculate_time_gap(leader_time, participant_time):
+    """Calculate time gap between leader and participant"""
+    gap_seconds = participant_time - leader_time
+    if gap_seconds == 0:
+        return "Leader"
+    return f"+{seconds_to_time_str(gap_seconds)}"
+
+def process_riders_data(riders_df, participants=PARTICIPANTS):
+    """Process the Replit_Riders worksheet data into {team: [riders]}"""
+    if riders_df is None:
+        return None
+
+    team_rosters = {participant: [] for participant in participants}
+
+    try:
+        # Clean column names by stripping whitespace
+        riders_df.columns = riders_df.columns.str.strip()
+
+        # Process each row in the riders DataFrame
+        for idx, row in riders_df.iterrows():
+            if pd.notna(row.get('Rider')) and pd.notna(row.get('Team')):
+                rider_name = str(row['Rider']).strip()
+                team_name = str(row['Team']).strip()
+
+                # Add rider to the appropriate team if it's one of our participants
+                if team_name in participants:
+                    team_rosters[team_name].append(rider_name)
+
+    except Exception as e:
+        raise StandingsError(f"Error processing rider data: {str(e)}") from e
+
+    return team_rosters
+
+def process_data(df, participants=PARTICIPANTS):
+    """Process the raw CSV data to get current standings and stage-by-stage data.
+
+    ``participants=None`` takes every named row with at least one stage time.
+    """
+    if df is None:
+        return None
+
+    participant_data = {}
+
+    try:
+        # Locate the name column and stage columns (cached by layout fingerprint)
+        layout = find_layout(df)
+        stage_end = min(layout['stage_start'] + layout['stage_count'], df.shape[1])
+        sheet = df.iloc[layout_first_row(layout):]
+
+        # Participant rows below the stage-header row (a repeated name keeps its last row)
+        names = sheet.iloc[:, layout['name_column']].fillna("").astype(str).str.strip().to_numpy()
+        wanted = set(participants) if participants is not None else None
+        rows = {name: row for row, name in enumerate(names) if (name in wanted if wanted is not None else name != "")}
+        raw_times = sheet.iloc[list(rows.values()), layout['stage_start']:stage_end].to_numpy(dtype=object)
+
+        # Parse every stage time at once; "0:00:00" and blanks mark stages not yet raced
+        time_text = pd.Series(raw_times.ravel(), dtype=object).fillna("").astype(str).str.strip()
+        present = ((time_text != "") & (time_text != "0:00:00")).to_numpy().reshape(raw_times.shape)
+        parts = time_text.str.extract(r'^(\d+):(\d+):(\d+)(?::.*)?$').astype(float).to_numpy()
+        seconds = np.nan_to_num(parts @ np.array([3600, 60, 1])).astype(np.int32).reshape(raw_times.shape)
+        if wanted is None:
+            # Without a participant list, header and note rows are told apart by having no parsable time
+            present = present & ~np.isnan(parts).any(axis=1).reshape(raw_times.shape)
+
+        # Only participants with at least one stage time are ranked
+        has_times = present.any(axis=1)
+        row_names = [name for name, keep in zip(rows, has_times) if keep]
+        raw_times, present, seconds = raw_times[has_times], present[has_times], seconds[has_times]
+
+        # Find the latest stage with data (non-zero times)
+        last_stage = present.shape[1] - np.argmax(present[:, ::-1], axis=1)
+        latest_stage = int(max(1, last_stage.max(initial=1)))
+        running_latest = np.maximum.accumulate(np.maximum(last_stage, 1)) if len(row_names) else []
+
+        for row, participant_name in enumerate(row_names):
+            # Get the most recent time for current standings
+            participant_data[participant_name] = {
+                'time': raw_times[row, last_stage[row] - 1],
+                'time_seconds': int(seconds[row, last_stage[row] - 1]),
+                'stage': int(running_latest[row])
+            }
+
+        # Store all stage data for charts in a compact array-backed table
+        stage_by_stage_data = StageTable(row_names, seconds, present)
+
+    except Exception as e:
+        raise StandingsError(f"Error processing data: {str(e)}") from e
+
+    if not participant_data:
+        raise StandingsError("No participant data found in the spreadsheet")
+
+    # Rank by time (lowest time wins); equal times are split by countback and exact ties share a position
+    positions = standings_ranks(stage_by_stage_data.cumulative_matrix(present.shape[1]))
+    sorted_participants = [
+        (row_names[row], participant_data[row_names[row]])
+        for row in np.argsort(positions, kind='stable')
+    ]
+
+    # Calculate gaps from leader
+    leader_time = sorted_participants[0][1]['time_seconds']
+    for name, data in sorted_participants:
+        data['gap'] = calculate_time_gap(leader_time, data['time_seconds'])
+        data['position'] = int(positions[stage_by_stage_data.index[name]])
+
+    return sorted_participants, latest_stage, stage_by_stage_data
+
+def standings_frame(processed_data):
+    """Flat standings table with the secondary classifications alongside, one row per participant"""
+    sorted_participants, latest_stage, stage_by_stage_data = processed_data
+    names, cumulative = build_stage_matrix(stage_by_stage_data, latest_stage)
+    splits = split_matrix(cumulative)
+    results = classifications(splits, rank_columns(splits))
+    rows = [stage_by_stage_data.index[name] for name, _ in sorted_participants]
+    return pd.DataFrame({
+        'position': [data['position'] for _, data in sorted_participants],
+        'participant': [name for name, _ in sorted_participants],
+        'time': [str(data['time']).strip() for _, data in sorted_participants],
+        'time_seconds': [data['time_seconds'] for _, data in sorted_participants],
+        'gap': [data['gap'] for _, data in sorted_participants],
+        'stage': [data['stage'] for _, data in sorted_participants],
+        'stage_wins': results['stage_wins'][rows],
+        'points': results['points'][rows],
+        'consistency_seconds': results['consistency'][rows],
+        'form_seconds': results['form'][rows]
+    })
+
+def stage_columns_frame(names, matrix):
+    """Participants x stages matrix as a frame with nullable int32 ``stage_NN`` columns (NaN becomes <NA>)"""
+    return pd.DataFrame(
+        {f"stage_{stage + 1:02d}": pd.array(np.where(np.isnan(matrix[:, stage]), None, matrix[:, stage]), dtype='Int32') for stage in range(matrix.shape[1])},
+        index=pd.Index(names, name='participant')
+    )
+
+def gc_rank_frame(processed_data):
+    """GC position of every participant after every completed stage (participants x stages)"""
+    _, latest_stage, stage_by_stage_data = processed_data
+    names, cumulative = build_stage_matrix(stage_by_stage_data, latest_stage)
+    return stage_columns_frame(names, gc_rank_matrix(cumulative))
+
+def split_frame(processed_data):
+    """Stage split time in seconds of every participant for every completed stage (participants x stages)"""
+    _, latest_stage, stage_by_stage_data = processed_data
+    names, cumulative = build_stage_matrix(stage_by_stage_data, latest_stage)
+    return stage_columns_frame(names, split_matrix(cumulative))
+
+def stage_rank_frame(processed_data):
+    """Stage placing of every participant on every completed stage (participants x stages)"""
+    _, latest_stage, stage_by_stage_data = processed_data
+    names, cumulative = build_stage_matrix(stage_by_stage_data, latest_stage)
+    return stage_columns_frame(names, rank_columns(split_matrix(cumulative)))
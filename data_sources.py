@@ -0,0 +1,153 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from io import StringIO
+
+import pandas as pd
+import requests
+
+HTTP_TIMEOUT = (5, 15)  # Seconds to connect / to wait for the response body
+
+
+class DataSource:
+    """A place the app can read a sheet-shaped DataFrame from.
+
+    ``change_token()`` is a cheap check (file mtime, HTTP validator, row version)
+    that changes whenever the underlying data may have changed. ``fetch()``
+    returns ``(df, token)`` and only re-reads the data when the token moved.
+    """
+
+    def __init__(self):
+        self.last_token = None
+        self.last_df = None
+        self.lock = threading.Lock()  # Sources are shared between sessions
+
+    def change_token(self):
+        raise NotImplementedError
+
+    def read(self):
+        raise NotImplementedError
+
+    def fetch(self):
+        with self.lock:
+            token = self.change_token()
+            if token is None or token != self.last_token or self.last_df is None:
+                self.last_df = self.read()
+                self.last_token = token
+            return self.last_df, self.last_token
+
+
+class HttpCsvSource(DataSource):
+    """CSV export over HTTP (e.g. a Google Sheets export URL).
+
+    ``fetch()`` is a single conditional GET, so there is no separate change check.
+    """
+
+    def __init__(self, url, timeout=HTTP_TIMEOUT):
+        super().__init__()
+        self.url = url
+        self.timeout = timeout
+        # Use session to handle redirects properly
+        self.session = requests.Session()
+        self.validators = {}
+
+    def read(self):
+        # A plain GET outside the lock; fetch() is the cached path
+        response = self.session.get(self.url, allow_redirects=True, timeout=self.timeout)
+        response.raise_for_status()
+        return pd.read_csv(StringIO(response.text))
+
+    def fetch(self):
+        with self.lock:
+            return self.conditional_get()
+
+    def conditional_get(self):
+        # A 304 means the last response is still current
+        headers = {}
+        if self.last_df is not None:
+            if 'ETag' in self.validators:
+                headers['If-None-Match'] = self.validators['ETag']
+            if 'Last-Modified' in self.validators:
+                headers['If-Modified-Since'] = self.validators['Last-Modified']
+        response = self.session.get(self.url, headers=headers, allow_redirects=True, timeout=self.timeout)
+        if response.status_code == 304:
+            return self.last_df, self.last_token
+        response.raise_for_status()
+
+        self.validators = {key: response.headers[key] for key in ('ETag', 'Last-Modified') if response.headers.get(key)}
+        # Without server validators the body hash still tells unchanged data apart
+        self.last_token = self.validators.get('ETag') or hashlib.sha1(response.content).hexdigest()
+        self.last_df = pd.read_csv(StringIO(response.text))
+        return self.last_df, self.last_token
+
+
+class FileSource(DataSource):
+    """Base for local files: the change token is the file's mtime and size"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def change_token(self):
+        stat = os.stat(self.path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+class LocalCsvSource(FileSource):
+    """CSV file on disk in the same layout as the sheet export"""
+
+    def read(self):
+        return pd.read_csv(self.path)
+
+
+class ParquetSource(FileSource):
+    """Parquet file on disk holding the sheet's columns"""
+
+    def read(self):
+        return pd.read_parquet(self.path)
+
+
+class SqliteSource(DataSource):
+    """Table in a SQLite database holding the sheet's columns"""
+
+    def __init__(self, path, table):
+        super().__init__()
+        self.path = path
+        self.table = table
+
+    def change_token(self):
+        # Row version: the highest rowid and row count move on every insert/delete,
+        # and the file mtimes move on in-place updates
+        with closing(sqlite3.connect(self.path)) as connection:
+            max_rowid, row_count = connection.execute(
+                f'SELECT MAX(rowid), COUNT(*) FROM "{self.table}"'
+            ).fetchone()
+        mtimes = [os.stat(path).st_mtime_ns for path in (self.path, self.path + '-wal') if os.path.exists(path)]
+        return f"{max_rowid}-{row_count}-{'-'.join(map(str, mtimes))}"
+
+    def read(self):
+        with closing(sqlite3.connect(self.path)) as connection:
+            return pd.read_sql_query(f'SELECT * FROM "{self.table}" ORDER BY rowid', connection)
+
+
+def source_from_uri(uri, default_table='standings'):
+    """Pick a data source from a URL or path.
+
+    ``http(s)://`` URLs are CSV exports; local paths are chosen by extension
+    (``.csv``, ``.parquet``, ``.db``/``.sqlite``/``.sqlite3``). SQLite paths take
+    the table name after ``#`` (``league.db#riders``), else ``default_table``.
+    """
+    if uri.startswith(('http://', 'https://')):
+        return HttpCsvSource(uri)
+
+    path, _, table = uri.partition('#')
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return LocalCsvSource(path)
+    if extension in ('.parquet', '.pq'):
+        return ParquetSource(path)
+    if extension in ('.db', '.sqlite', '.sqlite3'):
+        return SqliteSource(path, table or default_table)
+    raise ValueError(f"Unsupported data source: {uri}")
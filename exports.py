@@ -0,0 +1,116 @@
+"""Downloadable exports of the processed standings, stage analytics and rosters.
+
+Files are rendered on first request and kept in an ``ExportCache`` keyed by
+snapshot, table and format, so repeated downloads of the same snapshot reuse
+the bytes. The cache drops the least recently used files beyond a total size
+budget. Excel exports need the optional ``openpyxl`` package.
+"""
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+import core
+from rosters import build_roster_view
+
+MAX_EXPORT_CACHE_BYTES = 64 * 1024 * 1024  # Total size of rendered files kept in memory
+
+EXPORT_TABLES = {
+    'standings': "Standings",
+    'splits': "Stage splits",
+    'stage_ranks': "Stage ranks",
+    'gc_ranks': "GC positions",
+    'rosters': "Rosters"
+}
+# Format -> (file extension, MIME type); Excel exports every table as one workbook
+EXPORT_FORMATS = {
+    'csv': ("csv", "text/csv"),
+    'parquet': ("parquet", "application/vnd.apache.parquet"),
+    'xlsx': ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+}
+
+
+def excel_available():
+    """Whether the optional Excel writer is installed"""
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def export_table(table, processed_data, team_rosters):
+    """One export table as a flat DataFrame"""
+    if table == 'standings':
+        return core.standings_frame(processed_data)
+    if table == 'rosters':
+        return build_roster_view(team_rosters or {})['frame']
+    frame = {'splits': core.split_frame, 'stage_ranks': core.stage_rank_frame, 'gc_ranks': core.gc_rank_frame}[table]
+    return frame(processed_data).reset_index()
+
+def render_export(table, fmt, processed_data, team_rosters):
+    """Render one table as CSV or Parquet bytes, or every table as an Excel workbook"""
+    if fmt == 'xlsx':
+        buffer = io.BytesIO()
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            for name, label in EXPORT_TABLES.items():
+                export_table(name, processed_data, team_rosters).to_excel(writer, sheet_name=label, index=False)
+        return buffer.getvalue()
+    frame = export_table(table, processed_data, team_rosters)
+    if fmt == 'csv':
+        return frame.to_csv(index=False).encode()
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+class ExportCache:
+    """Rendered export files by (snapshot, table, format), least recently used dropped beyond ``max_bytes``.
+
+    Concurrent requests for the same file wait for one render instead of each
+    rendering it.
+    """
+
+    def __init__(self, max_bytes=MAX_EXPORT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.files = OrderedDict()  # key -> bytes, most recently used last
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.render_locks = {}  # key -> Lock held while that file renders
+
+    def get(self, key):
+        """Cached file for ``key``, or None if it has not been rendered"""
+        with self.lock:
+            if key not in self.files:
+                return None
+            self.files.move_to_end(key)
+            return self.files[key]
+
+    def get_or_render(self, key, render):
+        """Cached file for ``key``, rendering it with ``render()`` on first request"""
+        data = self.get(key)
+        if data is not None:
+            return data
+        with self.lock:
+            render_lock = self.render_locks.setdefault(key, threading.Lock())
+        with render_lock:
+            data = self.get(key)
+            if data is None:
+                data = render()
+                self.put(key, data)
+        with self.lock:
+            self.render_locks.pop(key, None)
+        return data
+
+    def put(self, key, data):
+        # A file bigger than the whole budget is served but not kept
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.files:
+                self.total_bytes -= len(self.files.pop(key))
+            self.files[key] = data
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self.files.popitem(last=False)
+                self.total_bytes -= len(evicted)
@@ -0,0 +1,193 @@
+"""Refresh many leagues per cycle on a process pool.
+
+Each league's sheet is fetched and processed in a worker process, which sends
+back a ``LeagueSnapshot``: the standings as a handful of flat numpy arrays
+rather than the nested ``(sorted_participants, latest_stage, stage_data)``
+structure, so the parent unpickles a few buffers per league. Leagues are
+reported as they finish, and a league still processing when the next cycle
+starts is not submitted again, so one slow, huge league never holds up the rest.
+``cli.py`` runs one cycle of it when given several sheets and ``--workers`` > 1.
+
+    python league_refresh.py leagues/*.csv --cycles 3 --workers 8
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from functools import partial
+
+import numpy as np
+
+import core
+from data_sources import source_from_uri
+from stage_table import StageTable, format_stage_time
+
+SOURCES = {}  # Per worker process: uri -> DataSource, so unchanged sheets are not re-read
+
+
+class LeagueSnapshot:
+    """One league's processed standings as flat arrays, in StageTable row order"""
+
+    __slots__ = ('names', 'positions', 'stages', 'seconds', 'present', 'latest_stage')
+
+    def __init__(self, names, positions, stages, seconds, present, latest_stage):
+        self.names = np.asarray(names, dtype=str)
+        self.positions = np.asarray(positions, dtype=np.int32)
+        self.stages = np.asarray(stages, dtype=np.int16)
+        self.seconds = np.ascontiguousarray(seconds, dtype=np.int32)
+        self.present = np.ascontiguousarray(present, dtype=bool)
+        self.latest_stage = int(latest_stage)
+
+    def __reduce__(self):
+        return (LeagueSnapshot, (self.names, self.positions, self.stages, self.seconds, self.present, self.latest_stage))
+
+    @classmethod
+    def from_processed(cls, processed_data):
+        sorted_participants, latest_stage, stage_by_stage_data = processed_data
+        rows = [stage_by_stage_data.index[name] for name, _ in sorted_participants]
+        positions = np.empty(len(rows), dtype=np.int32)
+        stages = np.empty(len(rows), dtype=np.int16)
+        positions[rows] = [data['position'] for _, data in sorted_participants]
+        stages[rows] = [data['stage'] for _, data in sorted_participants]
+        return cls(stage_by_stage_data.names, positions, stages, stage_by_stage_data.seconds, stage_by_stage_data.present, latest_stage)
+
+    def current_seconds(self):
+        """Cumulative seconds after each participant's latest stage with a time"""
+        last_stage = self.present.shape[1] - np.argmax(self.present[:, ::-1], axis=1)
+        return self.seconds[np.arange(len(self.names)), last_stage - 1]
+
+    def processed_data(self):
+        """Rebuild the ``process_data`` result the app and analytics work with"""
+        names = self.names.tolist()
+        current = self.current_seconds()
+        order = np.argsort(self.positions, kind='stable')
+        leader_time = int(current[order[0]]) if len(order) else 0
+        sorted_participants = [
+            (names[row], {
+                'time': format_stage_time(int(current[row])),
+                'time_seconds': int(current[row]),
+                'stage': int(self.stages[row]),
+                'gap': core.calculate_time_gap(leader_time, int(current[row])),
+                'position': int(self.positions[row])
+            })
+            for row in order
+        ]
+        return sorted_participants, self.latest_stage, StageTable(names, self.seconds, self.present)
+
+
+def refresh_league(uri, participants=None, previous_token=None):
+    """Fetch and process one league in a worker; skips processing when the sheet's token did not move"""
+    started = time.perf_counter()
+    result = {'source': uri, 'token': previous_token, 'snapshot': None, 'error': None}
+    try:
+        if uri not in SOURCES:
+            SOURCES[uri] = source_from_uri(uri)
+        df, token = SOURCES[uri].fetch()
+        if token is None or token != previous_token:
+            result['snapshot'] = LeagueSnapshot.from_processed(core.process_data(df, participants))
+            result['token'] = token
+    except (core.StandingsError, OSError, ValueError) as e:
+        result['error'] = str(e)
+    except Exception as e:
+        # Anything else (e.g. sqlite3.OperationalError for a missing table) fails this league only
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['elapsed'] = time.perf_counter() - started
+    return result
+
+
+class RefreshScheduler:
+    """Refresh a fixed set of leagues on a persistent process pool, one cycle at a time.
+
+    ``snapshots`` holds the latest good snapshot per league and ``timings`` the
+    processing time of each league's last run (seconds, including the fetch).
+    """
+
+    def __init__(self, sources, participants=None, workers=None):
+        self.sources = list(sources)
+        self.participants = participants
+        self.pool = ProcessPoolExecutor(max_workers=workers or min(len(self.sources), os.cpu_count() or 1))
+        self.tokens = {}
+        self.snapshots = {}
+        self.timings = {}
+        self.errors = {}
+        self.in_flight = {}  # uri -> Future still processing
+        self.lock = threading.Lock()  # Done-callbacks run on the pool's manager thread
+
+    def submit_cycle(self):
+        """Start a refresh of every league that is not still running from an earlier cycle"""
+        submitted = {}
+        with self.lock:
+            for uri in self.sources:
+                if uri not in self.in_flight:
+                    submitted[uri] = self.in_flight[uri] = self.pool.submit(refresh_league, uri, self.participants, self.tokens.get(uri))
+        # Outside the lock: a future that already finished runs its callback right here
+        for uri, future in submitted.items():
+            future.add_done_callback(partial(self.store, uri))
+        return list(submitted)
+
+    def store(self, uri, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            # Unexpected worker errors (or a broken pool) must not leave the league stuck in flight
+            result = {'source': uri, 'error': f"{type(e).__name__}: {e}", 'elapsed': float('nan')}
+        finally:
+            with self.lock:
+                self.in_flight.pop(uri, None)
+        with self.lock:
+            self.timings[uri] = result['elapsed']
+            if result['error']:
+                self.errors[uri] = result['error']
+                return
+            self.errors.pop(uri, None)
+            self.tokens[uri] = result['token']
+            if result['snapshot'] is not None:
+                self.snapshots[uri] = result['snapshot']
+
+    def refresh(self, timeout=None):
+        """Run one cycle and wait up to ``timeout`` seconds; returns the leagues still processing"""
+        self.submit_cycle()
+        with self.lock:
+            futures = list(self.in_flight.values())
+        wait(futures, timeout)
+        with self.lock:
+            return sorted(self.in_flight)
+
+    def processed_data(self, uri):
+        """Latest standings for one league in ``process_data`` form, or None before its first success"""
+        with self.lock:
+            snapshot = self.snapshots.get(uri)
+        return snapshot.processed_data() if snapshot is not None else None
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh many league sheets per cycle on a process pool")
+    parser.add_argument("sources", nargs="+", help="Sheet files (.csv, .parquet, .db#table) or CSV export URLs")
+    parser.add_argument("--cycles", type=int, default=3, help="Refresh cycles to run (default: 3)")
+    parser.add_argument("--interval", type=float, default=0, help="Seconds between cycles (default: 0)")
+    parser.add_argument("--timeout", type=float, help="Seconds a cycle waits for slow leagues (default: until all finish)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: one per CPU, capped at the number of sources)")
+    parser.add_argument("--participants", help="Comma-separated participant names (default: every named row with times)")
+    args = parser.parse_args()
+
+    participants = [name.strip() for name in args.participants.split(",")] if args.participants else None
+    scheduler = RefreshScheduler(args.sources, participants, args.workers or None)
+    for cycle in range(1, args.cycles + 1):
+        started = time.perf_counter()
+        pending = scheduler.refresh(args.timeout)
+        print(f"cycle {cycle}: {time.perf_counter() - started:.3f} s, {len(scheduler.snapshots)} leagues ready, {len(pending)} still processing")
+        time.sleep(args.interval)
+    scheduler.pool.shutdown(wait=True)
+
+    for uri in args.sources:
+        snapshot = scheduler.snapshots.get(uri)
+        status = scheduler.errors.get(uri) or (f"{len(snapshot.names)} participants, stage {snapshot.latest_stage}" if snapshot else "no data")
+        print(f"{uri}: {scheduler.timings.get(uri, float('nan')) * 1000:.1f} ms - {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Outbound notifications for leader changes and stage completions.
+
+Snapshot diffs (``snapshot_diff``) are turned into notifications and handed to a
+``Notifier``, which delivers them from an asyncio loop on its own thread: the
+refresh path only enqueues. Each target gets its own queue, batches what arrives
+within ``BATCH_WINDOW`` seconds, is rate limited by a token bucket and retries
+failed deliveries with jittered backoff.
+
+Run ``python notifier.py`` to deliver a burst of notifications to a local stub
+receiver and print the delivery metrics.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+BATCH_SIZE = 20  # Notifications sent in one request at most
+BATCH_WINDOW = 0.5  # Seconds a target waits for more notifications before sending a batch
+MAX_QUEUE = 1000  # Pending notifications per target; the oldest are dropped beyond this
+SEND_ATTEMPTS = 4
+SEND_BASE_DELAY = 0.5  # Seconds before the first retry, doubled per attempt (before jitter)
+SEND_TIMEOUT = 5
+LATENCY_SAMPLES = 1000  # Recent delivery latencies kept for the metrics
+
+
+def notifications_from_events(events, leader=None):
+    """Pick the diff events worth notifying about: a new leader and newly completed stages"""
+    notifications = []
+    for event in events:
+        if event['type'] == 'leader':
+            was = f" (was {event['from']})" if event['from'] is not None else ""
+            notifications.append({
+                'kind': 'leader_change',
+                'participant': event['participant'],
+                'text': f"🟡 {event['participant']} takes the lead{was}"
+            })
+        elif event['type'] == 'stage':
+            notifications.append({
+                'kind': 'stage_complete',
+                'stage': event['stage'],
+                'leader': leader,
+                'text': f"🏁 Stage {event['stage']} results are in" + (f" - {leader} leads" if leader else "")
+            })
+    return notifications
+
+
+class RateLimiter:
+    """Token bucket: ``rate`` sends per second on average, bursts of up to ``burst``"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class WebhookTarget:
+    """HTTP endpoint receiving a batch of notifications as JSON.
+
+    ``style='webhook'`` posts ``{"notifications": [...]}``; ``style='email'``
+    posts an email-shaped ``{"to", "subject", "text"}`` body for HTTP mail APIs.
+    """
+
+    def __init__(self, url, style='webhook', recipients=(), rate=1.0, burst=5, timeout=SEND_TIMEOUT):
+        self.url = url
+        self.style = style
+        self.recipients = list(recipients)
+        self.limiter = RateLimiter(rate, burst)
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    @property
+    def name(self):
+        return f"{self.style}:{self.url}"
+
+    def payload(self, batch):
+        notifications = [{key: value for key, value in item.items() if key != 'queued_at'} for item in batch]
+        if self.style == 'email':
+            subject = notifications[0]['text'] if len(notifications) == 1 else f"{notifications[0]['text']} (+{len(notifications) - 1} more)"
+            return {'to': self.recipients, 'subject': subject, 'text': "\n".join(item['text'] for item in notifications)}
+        return {'notifications': notifications}
+
+    def send(self, batch):
+        response = self.session.post(self.url, json=self.payload(batch), timeout=self.timeout)
+        response.raise_for_status()
+
+
+class Notifier:
+    """Deliver notifications to every target from a background asyncio loop"""
+
+    def __init__(self, targets):
+        self.targets = list(targets)
+        self.loop = asyncio.new_event_loop()
+        self.queues = {}
+        self.pending = {}  # Per target: notifications queued or in a batch being sent
+        self.tasks = []
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.counts = {'queued': 0, 'sent': 0, 'failed': 0, 'retries': 0, 'dropped': 0, 'batches': 0}
+        self.lock = threading.Lock()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(ready,), name="notifier", daemon=True)
+        self.thread.start()
+        ready.wait()
+
+    def run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        for target in self.targets:
+            self.queues[target.name] = asyncio.Queue(maxsize=MAX_QUEUE)
+            self.pending[target.name] = 0
+            self.tasks.append(self.loop.create_task(self.deliver(target)))
+        ready.set()
+        self.loop.run_forever()
+
+    def submit(self, notifications):
+        """Queue notifications for every target without waiting on delivery (safe from any thread)"""
+        for notification in notifications:
+            self.loop.call_soon_threadsafe(self.enqueue, dict(notification, queued_at=time.monotonic()))
+
+    def enqueue(self, notification):
+        for name, queue in self.queues.items():
+            if queue.full():
+                queue.get_nowait()
+                queue.task_done()
+                self.pending[name] -= 1
+                self.count('dropped')
+            queue.put_nowait(dict(notification))
+            self.pending[name] += 1
+            self.count('queued')
+
+    async def deliver(self, target):
+        queue = self.queues[target.name]
+        while True:
+            batch = [await queue.get()]
+            deadline = self.loop.time() + BATCH_WINDOW
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), max(deadline - self.loop.time(), 0)))
+                except asyncio.TimeoutError:
+                    break
+            await target.limiter.acquire()
+            await self.send_with_retries(target, batch)
+            self.pending[target.name] -= len(batch)
+            for _ in batch:
+                queue.task_done()
+
+    async def send_with_retries(self, target, batch):
+        for attempt in range(SEND_ATTEMPTS):
+            try:
+                await asyncio.to_thread(target.send, batch)
+            except Exception:
+                if attempt == SEND_ATTEMPTS - 1:
+                    self.count('failed', len(batch))
+                    return
+                self.count('retries')
+                await asyncio.sleep(random.uniform(0, SEND_BASE_DELAY * 2 ** attempt))
+                continue
+            delivered = time.monotonic()
+            with self.lock:
+                self.latencies.extend(delivered - item['queued_at'] for item in batch)
+            self.count('sent', len(batch))
+            self.count('batches')
+            return
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def flush(self, timeout=30):
+        """Block until every queued notification was delivered or given up on (for tests and shutdown)"""
+        async def drain():
+            await asyncio.gather(*(queue.join() for queue in self.queues.values()))
+        asyncio.run_coroutine_threadsafe(drain(), self.loop).result(timeout)
+
+    def metrics(self):
+        """Queue depth per target, delivery counts and latency percentiles (seconds)"""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            counts = dict(self.counts)
+        percentile = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else None
+        return {
+            'queue_depth': dict(self.pending),
+            **counts,
+            'latency_p50': statistics.median(latencies) if latencies else None,
+            'latency_p95': percentile(0.95),
+            'latency_max': latencies[-1] if latencies else None
+        }
+
+    def close(self):
+        """Stop delivering; anything still queued is discarded"""
+        async def stop():
+            for task in self.tasks:
+                task.cancel()
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        asyncio.run_coroutine_threadsafe(stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class StubReceiver:
+    """Local HTTP endpoint that records every payload posted to it.
+
+    ``fail_first`` requests are answered with 503 to exercise retries, and
+    ``delay`` seconds are added to each response to mimic a slow service.
+    """
+
+    def __init__(self, fail_first=0, delay=0):
+        self.received = []
+        self.failures_left = fail_first
+        self.delay = delay
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                time.sleep(receiver.delay)
+                if receiver.failures_left > 0:
+                    receiver.failures_left -= 1
+                    self.send_response(503)
+                else:
+                    receiver.received.append((self.path, json.loads(body)))
+                    self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path="/"):
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def close(self):
+        self.server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver a burst of notifications to a local stub receiver")
+    parser.add_argument("--notifications", type=int, default=50, help="Notifications to submit (default: 50)")
+    parser.add_argument("--fail-first", type=int, default=2, help="Requests the stub rejects before accepting (default: 2)")
+    parser.add_argument("--delay", type=float, default=0.05, help="Stub response time in seconds (default: 0.05)")
+    args = parser.parse_args()
+
+    receiver = StubReceiver(args.fail_first, args.delay)
+    notifier = Notifier([
+        WebhookTarget(receiver.url("/webhook"), rate=5, burst=2),
+        WebhookTarget(receiver.url("/email"), style='email', recipients=["league@example.com"], rate=2, burst=1)
+    ])
+    started = time.perf_counter()
+    notifier.submit(
+        {'kind': 'stage_complete', 'stage': stage, 'text': f"🏁 Stage {stage} results are in"}
+        for stage in range(1, args.notifications + 1)
+    )
+    print(f"submit returned in {(time.perf_counter() - started) * 1000:.2f} ms")
+    time.sleep(0.1)
+    print(f"queue depth after 0.1 s: {notifier.metrics()['queue_depth']}")
+    notifier.flush()
+    print(f"delivered in {time.perf_counter() - started:.2f} s")
+    for key, value in notifier.metrics().items():
+        print(f"{key}: {value}")
+    print(f"stub received {len(receiver.received)} requests")
+    notifier.close()
+    receiver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Replay a recorded season through the fetch -> process_data -> charts pipeline.
+
+Plays a sequence of sheet snapshots (one file per update, in name order) at an
+accelerated clock and records per-update latency, cache hit rates and memory,
+so refresh strategies can be compared on real data before race day:
+
+    python replay.py snapshots/ --strategy always --strategy token
+    python replay.py --from-season final_2025.csv --poll-interval 300 --speed 0
+"""
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import core
+from data_sources import source_from_uri
+
+STRATEGIES = ("always", "token")
+
+
+def expand_season(season_path, output_dir, total_stages=21):
+    """Split a full-season sheet into one snapshot per completed stage (later stages blanked as 0:00:00)"""
+    season_df = pd.read_csv(season_path, dtype=str)
+    paths = []
+    for stage in range(1, total_stages + 1):
+        snapshot = season_df.copy()
+        for col_idx in range(stage + 1, min(total_stages + 1, snapshot.shape[1])):
+            # Only blank time cells so header rows and names survive
+            column = snapshot.iloc[:, col_idx]
+            is_time = column.fillna("").str.match(r"^\d+:\d{2}:\d{2}$")
+            snapshot.iloc[is_time.to_numpy(), col_idx] = "0:00:00"
+        path = os.path.join(output_dir, f"stage_{stage:02d}.csv")
+        snapshot.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+def snapshot_paths(snapshot_dir):
+    """Recorded snapshot files in replay order"""
+    return [
+        os.path.join(snapshot_dir, name)
+        for name in sorted(os.listdir(snapshot_dir))
+        if os.path.splitext(name)[1].lower() in (".csv", ".parquet", ".pq", ".db", ".sqlite", ".sqlite3")
+    ]
+
+def publish_snapshot(snapshot_path, live_path):
+    """Make a snapshot the current data, the way an editor saving the sheet would"""
+    staging_path = live_path + ".tmp"
+    shutil.copyfile(snapshot_path, staging_path)
+    os.replace(staging_path, live_path)
+
+def render_charts(pipeline, processed_data):
+    """Build every stage-analysis figure the app would serve"""
+    sorted_participants, latest_stage, stage_by_stage_data = processed_data
+    names, splits, split_ranks = pipeline.get_split_matrix(stage_by_stage_data, pipeline.COMPETITION_CONFIG["total_stages"])
+    return [
+        pipeline.create_cumulative_time_chart(stage_by_stage_data, latest_stage),
+        pipeline.create_stage_performance_chart(stage_by_stage_data, latest_stage),
+        pipeline.create_gap_evolution_chart(stage_by_stage_data, latest_stage),
+        pipeline.create_stage_heatmap_chart(names, splits, split_ranks, [name for name, _ in sorted_participants]),
+    ]
+
+def replay(paths, strategy, poll_interval=300, snapshot_interval=3600, speed=0, track_memory=True):
+    """Play snapshots through the pipeline and return one record per poll.
+
+    Snapshot ``i`` is published at simulated time ``i * snapshot_interval`` and the
+    app polls every ``poll_interval`` simulated seconds. ``speed`` is the clock
+    acceleration (0 = no sleeping). The ``token`` strategy skips processing and
+    charts while the source's change token is unchanged; ``always`` redoes them.
+    """
+    # Deferred: importing the app pulls in Streamlit, which warns about running outside a server
+    import app as pipeline
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+    records = []
+    with tempfile.TemporaryDirectory() as live_dir:
+        live_path = os.path.join(live_dir, "live" + os.path.splitext(paths[0])[1])
+        publish_snapshot(paths[0], live_path)
+        source = source_from_uri(live_path)
+
+        published = 0
+        last_token = None
+        processed_data = None
+        end_time = (len(paths) - 1) * snapshot_interval
+        clock = 0
+        while clock <= end_time:
+            # Publish every snapshot that is due by now
+            due = min(int(clock // snapshot_interval), len(paths) - 1)
+            while published < due:
+                published += 1
+                publish_snapshot(paths[published], live_path)
+
+            if track_memory:
+                tracemalloc.start()
+                tracemalloc.reset_peak()
+            started = time.perf_counter()
+            previous_df = source.last_df
+            df, token = source.fetch()
+            fetched = time.perf_counter()
+
+            cache_hit = strategy == "token" and token == last_token and processed_data is not None
+            if not cache_hit:
+                try:
+                    processed_data = core.process_data(df)
+                except core.StandingsError:
+                    processed_data = None
+            processed = time.perf_counter()
+            if not cache_hit and processed_data is not None:
+                render_charts(pipeline, processed_data)
+            rendered = time.perf_counter()
+            peak_memory = tracemalloc.get_traced_memory()[1] if track_memory else 0
+            if track_memory:
+                tracemalloc.stop()
+
+            records.append({
+                "strategy": strategy,
+                "clock": clock,
+                "snapshot": published,
+                "source_reread": df is not previous_df,
+                "cache_hit": cache_hit,
+                "fetch_ms": (fetched - started) * 1000,
+                "process_ms": (processed - fetched) * 1000,
+                "charts_ms": (rendered - processed) * 1000,
+                "total_ms": (rendered - started) * 1000,
+                "peak_memory_kb": peak_memory / 1024
+            })
+            last_token = token
+
+            clock += poll_interval
+            if speed:
+                time.sleep(poll_interval / speed)
+
+    return records
+
+def summarize(records):
+    """Latency percentiles, hit rates and memory for one strategy's records"""
+    totals = sorted(record["total_ms"] for record in records)
+    percentile = lambda q: totals[min(len(totals) - 1, int(q * len(totals)))]
+    return {
+        "strategy": records[0]["strategy"],
+        "polls": len(records),
+        "p50_ms": round(statistics.median(totals), 2),
+        "p95_ms": round(percentile(0.95), 2),
+        "max_ms": round(totals[-1], 2),
+        "total_s": round(sum(totals) / 1000, 3),
+        "cache_hit_rate": round(sum(record["cache_hit"] for record in records) / len(records), 3),
+        "source_reread_rate": round(sum(record["source_reread"] for record in records) / len(records), 3),
+        "peak_memory_kb": round(max(record["peak_memory_kb"] for record in records), 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded sheet snapshots through the standings pipeline")
+    parser.add_argument("snapshots", nargs="?", help="Directory of snapshot files, replayed in name order")
+    parser.add_argument("--from-season", help="Full-season sheet CSV to split into per-stage snapshots")
+    parser.add_argument("--strategy", action="append", choices=STRATEGIES, help="Refresh strategy to replay (repeat to compare)")
+    parser.add_argument("--poll-interval", type=float, default=300, help="Simulated seconds between refreshes (default: 300)")
+    parser.add_argument("--snapshot-interval", type=float, default=3600, help="Simulated seconds between snapshots (default: 3600)")
+    parser.add_argument("--speed", type=float, default=0, help="Clock acceleration factor; 0 replays as fast as possible")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc memory tracking")
+    parser.add_argument("--output", help="Write per-update records to this CSV file")
+    args = parser.parse_args()
+
+    if not args.snapshots and not args.from_season:
+        parser.error("provide a snapshot directory or --from-season")
+
+    with tempfile.TemporaryDirectory() as season_dir:
+        paths = expand_season(args.from_season, season_dir) if args.from_season else snapshot_paths(args.snapshots)
+        if not paths:
+            parser.error("no snapshot files found")
+
+        all_records = []
+        summaries = []
+        for strategy in args.strategy or ["token"]:
+            records = replay(paths, strategy, args.poll_interval, args.snapshot_interval, args.speed, not args.no_memory)
+            all_records.extend(records)
+            summaries.append(summarize(records))
+
+    print(pd.DataFrame(summaries).to_string(index=False))
+    if args.output:
+        pd.DataFrame(all_records).to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
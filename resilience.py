@@ -0,0 +1,158 @@
+import hashlib
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+
+import requests
+
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5  # Seconds before the first retry, doubled per attempt (before jitter)
+RETRY_MAX_DELAY = 4
+# Network, file and locked-database errors are worth retrying; bad data is not
+RETRYABLE_ERRORS = (OSError, sqlite3.OperationalError)
+RETRYABLE_STATUS = {429}  # Client errors that clear up on their own; other 4xx answers are final
+
+BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failed fetches that open the circuit
+BREAKER_RESET_TIMEOUT = 60  # Seconds the circuit stays open before one trial fetch
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Stop calling an upstream after repeated failures.
+
+    Closed: calls go through. After ``failure_threshold`` consecutive failures the
+    circuit opens and calls fail fast for ``reset_timeout`` seconds. Then one
+    trial call is let through (half-open); success closes the circuit, failure
+    opens it again.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "open" if self.clock() - self.opened_at < self.reset_timeout else "half-open"
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            remaining = self.reset_timeout - (self.clock() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(f"upstream unavailable, next attempt in {remaining:.0f}s")
+            if self.trial_in_flight:
+                raise CircuitOpenError("upstream unavailable, trial request in progress")
+            self.trial_in_flight = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+
+
+def is_client_error(error):
+    """Whether an error is a 4xx HTTP answer (except 429), which will not change on retry"""
+    if not isinstance(error, requests.HTTPError) or error.response is None:
+        return False
+    status = error.response.status_code
+    return 400 <= status < 500 and status not in RETRYABLE_STATUS
+
+def call_with_retries(call, attempts=RETRY_ATTEMPTS, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY, sleep=time.sleep):
+    """Call ``call()``, retrying transient errors with full-jitter exponential backoff"""
+    for attempt in range(attempts):
+        try:
+            return call()
+        except RETRYABLE_ERRORS as e:
+            if attempt == attempts - 1 or is_client_error(e):
+                raise
+            # Random delays keep sessions that failed together from retrying together
+            sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+def snapshot_path(snapshot_dir, uri):
+    """Last-known-good snapshot file for a data source URI"""
+    return os.path.join(snapshot_dir, hashlib.sha1(uri.encode()).hexdigest()[:16] + ".pkl")
+
+def save_snapshot(path, snapshot):
+    """Write a snapshot atomically, so a crash mid-write never leaves a torn file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # One staging file per writer, so concurrent saves never interleave in the same file
+    staging_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(staging_path, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(staging_path, path)
+
+def load_snapshot(path):
+    """Read a snapshot written by ``save_snapshot``, or None if it is missing or unreadable"""
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+class ResilientFetcher:
+    """Fetch from a DataSource with retries and a circuit breaker, falling back to the last good data.
+
+    Every successful fetch with a new change token is also written to
+    ``snapshot_path``, so the fallback survives restarts.
+    """
+
+    def __init__(self, source, snapshot_path, breaker=None):
+        self.source = source
+        self.snapshot_path = snapshot_path
+        self.breaker = breaker or CircuitBreaker()
+        self.last_good = None
+
+    def fetch(self):
+        """Return ``(df, token, status)``; status has 'stale', 'fetched_at' (epoch seconds) and 'error'.
+
+        Raises the upstream error only when there is no snapshot to fall back to.
+        """
+        try:
+            self.breaker.before_call()
+            try:
+                df, token = call_with_retries(self.source.fetch)
+            except Exception as e:
+                if is_client_error(e):
+                    # The upstream answered; a bad URL or permissions error is not an outage
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+        except Exception as e:
+            snapshot = self.last_good or load_snapshot(self.snapshot_path)
+            if snapshot is None:
+                raise
+            self.last_good = snapshot
+            return snapshot['df'], snapshot['token'], {'stale': True, 'fetched_at': snapshot['fetched_at'], 'error': str(e)}
+
+        changed = self.last_good is None or self.last_good['token'] != token or token is None
+        self.last_good = {'df': df, 'token': token, 'fetched_at': time.time()}
+        if changed:
+            try:
+                save_snapshot(self.snapshot_path, self.last_good)
+            except OSError:
+                pass  # A read-only disk only costs the fallback, not the fetch
+        return df, token, {'stale': False, 'fetched_at': self.last_good['fetched_at'], 'error': None}
@@ -0,0 +1,173 @@
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+NGRAM_SIZE = 3
+MAX_FUZZY_CANDIDATES = 20  # Names scored with the fuzzy matcher per unmatched roster entry
+MIN_MATCH_SCORE = 0.85
+ROSTER_COLUMNS = ('Fantasy Team', 'Roster Rider')  # Columns join_rosters_to_results puts before the result columns
+
+
+def build_roster_index(team_rosters):
+    """Build the rider ownership structures for one roster snapshot.
+
+    Returns a dict with the team and rider labels, the rider -> teams inverted
+    index (team row numbers) and a sparse teams x riders incidence matrix.
+    """
+    teams = list(team_rosters.keys())
+    riders = sorted({rider for roster in team_rosters.values() for rider in roster})
+    rider_columns = {rider: col for col, rider in enumerate(riders)}
+
+    rows = []
+    cols = []
+    for row, team in enumerate(teams):
+        for rider in team_rosters[team]:
+            rows.append(row)
+            cols.append(rider_columns[rider])
+
+    incidence = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(teams), len(riders))
+    )
+    # A rider listed twice on one roster still counts once
+    incidence.data[:] = 1
+
+    # Column-major copy gives each rider's owning teams as a contiguous slice
+    by_rider = incidence.tocsc()
+    rider_teams = {
+        rider: by_rider.indices[by_rider.indptr[col]:by_rider.indptr[col + 1]]
+        for col, rider in enumerate(riders)
+    }
+
+    return {
+        'teams': teams,
+        'riders': riders,
+        'rider_teams': rider_teams,
+        'incidence': incidence
+    }
+
+def rider_ownership(roster_index):
+    """Number of teams owning each rider and the share of all teams (0-1)"""
+    teams_owning = np.asarray(roster_index['incidence'].sum(axis=0)).ravel().astype(int)
+    total_teams = max(len(roster_index['teams']), 1)
+    return teams_owning, teams_owning / total_teams
+
+def team_overlap(roster_index):
+    """Jaccard similarity between every pair of rosters (teams x teams)"""
+    incidence = roster_index['incidence']
+    shared = (incidence @ incidence.T).toarray()
+    roster_sizes = np.asarray(incidence.sum(axis=1)).ravel()
+    union = roster_sizes[:, None] + roster_sizes[None, :] - shared
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(union > 0, shared / union, 0).astype(np.float32)
+
+def build_roster_view(team_rosters):
+    """Build the roster table and rider search index for one roster snapshot.
+
+    Returns a dict with the team labels, a flat Team / No. / Rider frame grouped
+    by team, each team's row range in it and the accent- and case-folded rider
+    names the search box matches against.
+    """
+    teams = list(team_rosters.keys())
+    frame = pd.DataFrame(
+        [(team, number, rider) for team in teams for number, rider in enumerate(team_rosters[team], 1)],
+        columns=['Team', 'No.', 'Rider']
+    )
+    sizes = np.array([len(team_rosters[team]) for team in teams], dtype=np.int64)
+    ends = np.cumsum(sizes)
+    return {
+        'teams': teams,
+        'frame': frame,
+        'team_rows': {team: (int(end - size), int(end)) for team, size, end in zip(teams, sizes, ends)},
+        'search_keys': np.array([fold_rider_name(rider) for rider in frame['Rider']], dtype=str)
+    }
+
+def team_roster(roster_view, team):
+    """One team's riders in roster order"""
+    start, stop = roster_view['team_rows'][team]
+    return roster_view['frame']['Rider'].iloc[start:stop].tolist()
+
+def search_roster(roster_view, query):
+    """Roster rows whose rider name contains ``query``, ignoring accents and case"""
+    needle = fold_rider_name(query).strip()
+    if not needle or not len(roster_view['search_keys']):
+        return roster_view['frame'].iloc[:0]
+    return roster_view['frame'][np.char.find(roster_view['search_keys'], needle) >= 0]
+
+def fold_rider_name(name):
+    """Fold accents and case ("Pogačar" -> "pogacar")"""
+    folded = unicodedata.normalize('NFKD', str(name))
+    folded = "".join(char for char in folded if not unicodedata.combining(char)).casefold()
+    return folded.replace("ø", "o").replace("ß", "ss").replace("đ", "d").replace("ł", "l")
+
+def normalize_rider_name(name):
+    """Fold accents and case and sort name tokens ("Pogačar Tadej" and "Tadej POGACAR" -> "pogacar tadej")"""
+    tokens = re.findall(r"[a-z0-9]+", fold_rider_name(name))
+    return " ".join(sorted(tokens))
+
+def name_ngrams(key):
+    """Character n-grams of a normalized name, used as blocking buckets"""
+    padded = f" {key} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(max(len(padded) - NGRAM_SIZE + 1, 1))}
+
+def build_name_index(names):
+    """Index official rider names by normalized key (hash join) and by n-gram bucket (fuzzy fallback)"""
+    keys = [normalize_rider_name(name) for name in names]
+    exact = {}
+    buckets = {}
+    for position, key in enumerate(keys):
+        exact.setdefault(key, position)
+        for gram in name_ngrams(key):
+            buckets.setdefault(gram, []).append(position)
+    return {'names': list(names), 'keys': keys, 'exact': exact, 'buckets': buckets}
+
+def match_rider_name(name, name_index):
+    """Find the position of a rider in the name index, or None if nothing scores high enough"""
+    key = normalize_rider_name(name)
+    if key in name_index['exact']:
+        return name_index['exact'][key]
+
+    # Only names sharing the most n-gram buckets are scored, never the whole list
+    shared = Counter()
+    for gram in name_ngrams(key):
+        shared.update(name_index['buckets'].get(gram, ()))
+    best_position, best_score = None, MIN_MATCH_SCORE
+    for position, _ in shared.most_common(MAX_FUZZY_CANDIDATES):
+        score = SequenceMatcher(None, key, name_index['keys'][position]).ratio()
+        if score >= best_score:
+            best_position, best_score = position, score
+    return best_position
+
+def join_rosters_to_results(team_rosters, results_df, rider_column='Rider'):
+    """Join every rostered rider to its row in an official results table.
+
+    Returns the joined DataFrame (one row per team/rider: ``Fantasy Team``,
+    ``Roster Rider``, then the matched result columns) and the list of roster
+    names that could not be matched.
+    """
+    results_df = results_df.reset_index(drop=True)
+    name_index = build_name_index(results_df[rider_column].astype(str).tolist())
+
+    matched_rows = []
+    joined = []
+    positions = {}
+    for team, riders in team_rosters.items():
+        for rider in riders:
+            if rider not in positions:
+                positions[rider] = match_rider_name(rider, name_index)
+            if positions[rider] is not None:
+                joined.append((team, rider))
+                matched_rows.append(positions[rider])
+
+    unmatched = [rider for rider, position in positions.items() if position is None]
+    matches = results_df.iloc[matched_rows].reset_index(drop=True)
+    # Results files often have a Team column of their own (the pro team); keep it, prefixed if it would clash
+    matches.columns = [f"Result {column}" if column in ROSTER_COLUMNS else column for column in matches.columns]
+    matches.insert(0, ROSTER_COLUMNS[0], [team for team, _ in joined])
+    matches.insert(1, ROSTER_COLUMNS[1], [rider for _, rider in joined])
+    return matches, unmatched
@@ -0,0 +1,138 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from analytics import build_stage_matrix, split_matrix, rank_columns, standings_ranks
+from stage_table import StageTable
+
+ARCHIVE_DIR = os.environ.get("SEASON_ARCHIVE_DIR", "archive")
+MAX_LOADED_SEASONS = 3  # Full seasons kept in memory, least recently used dropped first
+SUMMARY_FILE = "summaries.parquet"
+
+
+def season_path(archive_dir, season):
+    """Columnar file holding one season's participants x stages cumulative times"""
+    return os.path.join(archive_dir, f"season_{season}.parquet")
+
+def write_parquet(frame, path):
+    """Write a Parquet file atomically, so readers never see a half-written season"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    staging_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    frame.to_parquet(staging_path, index=False)
+    os.replace(staging_path, path)
+
+def season_frame(table, total_stages):
+    """One row per participant, one nullable int32 column per stage (the per-stage snapshots)"""
+    _, cumulative = build_stage_matrix(table, total_stages)
+    frame = pd.DataFrame({'participant': pd.Series(list(table.names), dtype='string')})
+    for stage in range(total_stages):
+        frame[f"stage_{stage + 1:02d}"] = pd.array(
+            np.where(np.isnan(cumulative[:, stage]), None, cumulative[:, stage]), dtype='Int32'
+        )
+    return frame
+
+def season_summary(season, table, total_stages, complete=True):
+    """Standing of every participant: position, time, gap, stages completed and stage wins.
+
+    Rows of a season still in progress are marked ``complete=False``: their
+    positions are provisional, not final.
+    """
+    names, cumulative = build_stage_matrix(table, total_stages)
+    completed = ~np.isnan(cumulative)
+    stages_completed = completed.sum(axis=1)
+    last_stage = int(completed.any(axis=0).nonzero()[0].max(initial=-1)) + 1
+    # Participants missing the last stage keep their latest time
+    final_times = np.array([
+        cumulative[row, completed[row].nonzero()[0][-1]] if stages_completed[row] else np.nan
+        for row in range(len(names))
+    ])
+    final_positions = standings_ranks(cumulative)
+    stage_wins = (rank_columns(split_matrix(cumulative)) == 1).sum(axis=1)
+    return pd.DataFrame({
+        'season': season,
+        'participant': pd.Series(names, dtype='string'),
+        'final_position': pd.array(final_positions, dtype='Int32'),
+        'final_time_seconds': pd.array(np.where(np.isnan(final_times), None, final_times), dtype='Int32'),
+        'gap_seconds': pd.array(np.where(np.isnan(final_times), None, final_times - np.nanmin(final_times, initial=np.inf)), dtype='Int32'),
+        'stages_completed': stages_completed.astype(np.int16),
+        'stage_wins': stage_wins.astype(np.int16),
+        'last_stage': np.int16(last_stage),
+        'complete': bool(complete)
+    })
+
+def archive_season(season, table, total_stages, archive_dir=ARCHIVE_DIR, complete=True):
+    """Write (or overwrite) a season's stage file and its rows in the shared summaries file"""
+    write_parquet(season_frame(table, total_stages), season_path(archive_dir, season))
+
+    summary_path = os.path.join(archive_dir, SUMMARY_FILE)
+    summaries = season_summary(season, table, total_stages, complete)
+    if os.path.exists(summary_path):
+        existing = pd.read_parquet(summary_path)
+        summaries = pd.concat([existing[existing['season'] != season], summaries], ignore_index=True)
+    write_parquet(summaries.sort_values(['season', 'final_position'], ignore_index=True), summary_path)
+
+def read_season(path):
+    """Load a season file back into a StageTable"""
+    frame = pd.read_parquet(path)
+    stages = frame.drop(columns='participant')
+    present = stages.notna().to_numpy()
+    seconds = stages.to_numpy(dtype=np.float64, na_value=0).astype(np.int32)
+    return StageTable(frame['participant'].astype(str).tolist(), seconds, present)
+
+
+class SeasonArchive:
+    """Archived seasons, loaded lazily on first access and kept in memory under an LRU bound.
+
+    Cross-season views only read the small summaries file, never the season files.
+    """
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, max_loaded=MAX_LOADED_SEASONS):
+        self.archive_dir = archive_dir
+        self.max_loaded = max_loaded
+        self.loaded = {}  # season -> (file mtime, StageTable), most recently used last
+        self.summary_cache = (None, None)  # (file mtime, DataFrame)
+        self.lock = threading.Lock()  # Shared between sessions
+
+    def summaries(self):
+        """Per-season summary rows, re-read only when the file changed"""
+        path = os.path.join(self.archive_dir, SUMMARY_FILE)
+        if not os.path.exists(path):
+            return None
+        mtime = os.stat(path).st_mtime_ns
+        with self.lock:
+            if self.summary_cache[0] != mtime:
+                summaries = pd.read_parquet(path)
+                if 'complete' not in summaries:
+                    summaries['complete'] = True  # Written before provisional seasons were marked
+                self.summary_cache = (mtime, summaries)
+            return self.summary_cache[1]
+
+    def seasons(self):
+        """Archived seasons, newest first"""
+        summaries = self.summaries()
+        return [] if summaries is None else sorted(summaries['season'].unique().tolist(), reverse=True)
+
+    def season(self, season):
+        """The StageTable for one season, read from disk on first access"""
+        path = season_path(self.archive_dir, season)
+        mtime = os.stat(path).st_mtime_ns
+        with self.lock:
+            if season in self.loaded and self.loaded[season][0] == mtime:
+                self.loaded[season] = self.loaded.pop(season)  # Mark as most recently used
+                return self.loaded[season][1]
+        table = read_season(path)
+        with self.lock:
+            self.loaded.pop(season, None)
+            self.loaded[season] = (mtime, table)
+            while len(self.loaded) > self.max_loaded:
+                self.loaded.pop(next(iter(self.loaded)))
+        return table
+
+    def participant_history(self):
+        """Finishing position of every participant in every season (participants x seasons)"""
+        summaries = self.summaries()
+        if summaries is None:
+            return None
+        return summaries.pivot(index='participant', columns='season', values='final_position').sort_index(axis=1)
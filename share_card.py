@@ -0,0 +1,87 @@
+import hashlib
+import os
+import threading
+
+from PIL import Image, ImageDraw, ImageFont
+
+CARD_SIZE = (1200, 630)  # Open Graph / Twitter large-image size
+# Streamlit serves the static/ folder next to app.py at /app/static when server.enableStaticServing is on
+SHARE_CARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "share_cards")
+SHARE_CARD_URL = "app/static/share_cards"
+MAX_SHARE_CARDS = 32  # Cards kept on disk, least recently used removed first
+TOP_N = 5
+
+BACKGROUND = "#1e1e1e"
+PANEL = "#2d2d2d"
+GOLD = "#FFD700"
+TEXT = "#ffffff"
+MUTED = "#b0b0b0"
+
+
+def snapshot_hash(sorted_participants, latest_stage):
+    """Short hash of everything drawn on the card, so a card is rendered once per standings snapshot"""
+    signature = repr((latest_stage, [(name, data['time_seconds']) for name, data in sorted_participants]))
+    return hashlib.sha1(signature.encode()).hexdigest()[:16]
+
+def share_card_path(card_hash, card_dir=SHARE_CARD_DIR):
+    """Where the card for a snapshot hash is written"""
+    return os.path.join(card_dir, f"{card_hash}.png")
+
+def load_font(size, bold=False):
+    """DejaVu if the system has it, else Pillow's bundled font"""
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+def render_share_card(sorted_participants, latest_stage, total_stages, title):
+    """Draw the leader, the current stage and the top gaps on a dark 1200x630 card"""
+    width, height = CARD_SIZE
+    card = Image.new("RGB", CARD_SIZE, BACKGROUND)
+    draw = ImageDraw.Draw(card)
+
+    draw.rectangle([0, 0, width, 12], fill=GOLD)
+    draw.text((60, 45), title, font=load_font(44, bold=True), fill=TEXT)
+    draw.text((60, 105), f"Stage {latest_stage}/{total_stages} complete", font=load_font(30), fill=MUTED)
+
+    leader_name, leader = sorted_participants[0]
+    draw.rounded_rectangle([60, 165, width - 60, 265], radius=16, fill=PANEL, outline=GOLD, width=3)
+    draw.text((90, 185), "Yellow jersey", font=load_font(24), fill=GOLD)
+    draw.text((90, 215), leader_name, font=load_font(36, bold=True), fill=TEXT)
+    draw.text((width - 90, 215), leader['time'], font=load_font(36, bold=True), fill=GOLD, anchor="ra")
+
+    row_font = load_font(30)
+    for row, (name, data) in enumerate(sorted_participants[:TOP_N]):
+        y = 295 + row * 62
+        color = GOLD if row == 0 else TEXT
+        draw.text((90, y), f"{data['position']}. {name}", font=row_font, fill=color)
+        draw.text((width - 90, y), data['gap'] if row else "Leader", font=row_font, fill=color, anchor="ra")
+
+    return card
+
+def prune_share_cards(card_dir, max_cards):
+    """Delete the least recently used cards beyond ``max_cards``"""
+    cards = [os.path.join(card_dir, name) for name in os.listdir(card_dir) if name.endswith(".png")]
+    cards.sort(key=os.path.getmtime)
+    for path in cards[:max(len(cards) - max_cards, 0)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Already removed by another session
+
+def get_share_card(sorted_participants, latest_stage, total_stages, title, card_dir=SHARE_CARD_DIR, max_cards=MAX_SHARE_CARDS):
+    """Return ``(snapshot hash, PNG path)``, rendering the card only if this snapshot has none yet"""
+    card_hash = snapshot_hash(sorted_participants, latest_stage)
+    path = share_card_path(card_hash, card_dir)
+    try:
+        os.utime(path)  # Mark as recently used
+        return card_hash, path
+    except FileNotFoundError:
+        pass  # Not rendered yet, or just pruned by another session
+
+    os.makedirs(card_dir, exist_ok=True)
+    staging_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    render_share_card(sorted_participants, latest_stage, total_stages, title).save(staging_path, format="PNG", optimize=True)
+    os.replace(staging_path, path)
+    prune_share_cards(card_dir, max_cards)
+    return card_hash, path
@@ -0,0 +1,92 @@
+import hashlib
+import threading
+
+import pandas as pd
+
+MAX_STAGES = 21
+MAX_KNOWN_LAYOUTS = 8  # Layouts remembered across fetches (one per sheet being served)
+
+# Original layout: names in column A, stages 1-21 in columns B-V, data anywhere
+LEGACY_LAYOUT = {'header_row': None, 'name_column': 0, 'stage_start': 1, 'stage_count': MAX_STAGES}
+
+# Fingerprint -> layout for sheets seen before, most recently used last
+known_layouts = {}
+known_layouts_lock = threading.Lock()  # Sessions' script threads share known_layouts
+
+
+def layout_fingerprint(df, layout):
+    """Hash of everything the layout depends on: column count and the stage-header row"""
+    if layout['header_row'] is None:
+        header = list(df.columns)
+    else:
+        header = df.iloc[layout['header_row']].tolist() if layout['header_row'] < len(df) else []
+    signature = repr((df.shape[1], layout['header_row'], [str(cell).strip() for cell in header]))
+    return hashlib.sha1(signature.encode()).hexdigest()
+
+def numeric_cells(frame):
+    """Parse every cell as a number (NaN for names, times and blanks)"""
+    return frame.apply(lambda column: pd.to_numeric(column.astype(str).str.strip(), errors='coerce')).to_numpy()
+
+def stage_run(numbers):
+    """Find the longest run of consecutive stage numbers starting at 1: (start column, length)"""
+    best = (None, 0)
+    for start in (numbers == 1).nonzero()[0]:
+        length = 1
+        while start + length < len(numbers) and numbers[start + length] == length + 1:
+            length += 1
+        if length > best[1]:
+            best = (int(start), length)
+    return best
+
+def detect_layout(df):
+    """Scan the sheet for the stage-header row ("Stage | 1 | 2 | ...") and derive the name column and stage columns"""
+    best = None
+    # The header row may be the CSV header itself or any row containing a "1"
+    header_numbers = numeric_cells(pd.DataFrame([list(df.columns)]))[0]
+    body_numbers = numeric_cells(df)
+    candidates = [(None, header_numbers)] + [(int(row), body_numbers[row]) for row in (body_numbers == 1).any(axis=1).nonzero()[0]]
+    for header_row, numbers in candidates:
+        start, length = stage_run(numbers)
+        if start is not None and start > 0 and (best is None or length > best['stage_count']):
+            best = {'header_row': header_row, 'stage_start': start, 'stage_count': min(length, MAX_STAGES)}
+    if best is None:
+        return None
+
+    # Names sit in the column left of the stages with the most filled cells below the header
+    # (the one closest to the stages on a tie)
+    below = df.iloc[layout_first_row(best):, :best['stage_start']]
+    filled = (below.notna() & (below.astype(str).apply(lambda column: column.str.strip()) != "")).sum().to_numpy()
+    best['name_column'] = int(len(filled) - 1 - filled[::-1].argmax()) if len(below) else best['stage_start'] - 1
+    return best
+
+def find_layout(df):
+    """Return the sheet layout, reusing a known layout whose fingerprint still matches.
+
+    Full detection only runs when no remembered layout fingerprints the sheet,
+    i.e. when the columns or the stage-header row changed.
+    """
+    with known_layouts_lock:
+        remembered = list(known_layouts.items())[::-1]
+    for fingerprint, layout in remembered:
+        if layout_fingerprint(df, layout) == fingerprint:
+            with known_layouts_lock:
+                # Mark as most recently used (another session may have just evicted it)
+                known_layouts.pop(fingerprint, None)
+                known_layouts[fingerprint] = layout
+            return layout
+
+    layout = detect_layout(df)
+    if layout is None:
+        # No stage-header row: fall back to the original layout without remembering it,
+        # so a header row added later is picked up on the next fetch
+        return dict(LEGACY_LAYOUT)
+    layout['fingerprint'] = layout_fingerprint(df, layout)
+    with known_layouts_lock:
+        known_layouts[layout['fingerprint']] = layout
+        while len(known_layouts) > MAX_KNOWN_LAYOUTS:
+            known_layouts.pop(next(iter(known_layouts)))
+    return layout
+
+def layout_first_row(layout):
+    """First sheet row that can hold participant data"""
+    return 0 if layout['header_row'] is None else layout['header_row'] + 1
@@ -0,0 +1,70 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_TRIALS = 100_000
+CHUNK_TRIALS = 20_000  # Trials simulated per vectorized block (bounds peak memory)
+
+
+def completed_split_table(splits):
+    """Keep the stages that have been raced, filling a participant's missing splits with their own mean"""
+    raced = ~np.isnan(splits).all(axis=0)
+    table = splits[:, raced]
+    if table.size == 0:
+        return np.zeros((splits.shape[0], 1))
+    present = ~np.isnan(table)
+    means = np.nansum(table, axis=1) / np.maximum(present.sum(axis=1), 1)
+    return np.where(np.isnan(table), means[:, None], table)
+
+def simulate_chunk(current_times, split_table, remaining_stages, trials, seed):
+    """Simulate one block of trials and return a participants x positions count matrix"""
+    rng = np.random.default_rng(seed)
+    participants = len(current_times)
+    raced_stages = split_table.shape[1]
+
+    # Each simulated stage replays one completed stage for every participant at once, so
+    # stage-to-stage swings shared by all teams (mountains, crashes) carry over. Counting how
+    # often each completed stage is drawn turns the summed splits into one matrix product.
+    picks = rng.integers(0, raced_stages, size=(trials, remaining_stages))
+    draws = np.bincount(
+        (np.arange(trials)[:, None] * raced_stages + picks).ravel(),
+        minlength=trials * raced_stages
+    ).reshape(trials, raced_stages)
+    final_times = current_times + draws @ split_table.T
+
+    # Participant occupying each finishing position in every trial
+    finishers = np.argsort(final_times, axis=1, kind='stable')
+    flat = finishers * participants + np.arange(participants)
+    return np.bincount(flat.ravel(), minlength=participants * participants).reshape(participants, participants)
+
+def simulate_final_positions(current_times, splits, remaining_stages, trials=DEFAULT_TRIALS, seed=None, workers=1):
+    """Monte Carlo estimate of each participant's probability of finishing in each final position.
+
+    ``current_times`` holds cumulative seconds after the latest stage and ``splits``
+    the participants x stages split matrix (NaN for stages without a time). Remaining
+    stages are filled by resampling the completed stages' splits. With ``workers > 1``
+    blocks of trials are spread across a process pool.
+
+    Returns a participants x positions matrix of probabilities (rows sum to 1).
+    """
+    current_times = np.asarray(current_times, dtype=np.float64)
+    participants = len(current_times)
+    if participants == 0:
+        return np.zeros((0, 0))
+
+    split_table = completed_split_table(splits)
+    if remaining_stages <= 0:
+        # Nothing left to race: the current standings are final
+        trials = 1
+
+    # Independent random streams for each block so results don't depend on worker count
+    blocks = [min(CHUNK_TRIALS, trials - start) for start in range(0, trials, CHUNK_TRIALS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    jobs = [(current_times, split_table, max(remaining_stages, 0), size, block_seed) for size, block_seed in zip(blocks, seeds)]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            position_counts = sum(pool.map(simulate_chunk, *zip(*jobs)))
+    else:
+        position_counts = sum(simulate_chunk(*job) for job in jobs)
+
+    return position_counts / trials
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+MAX_EVENTS = 500  # Events kept in the ring buffer across all snapshots
+MAX_EVENTS_PER_DIFF = 100  # Largest moves kept from one snapshot change, so a big league can't flood the feed
+MIN_GAP_CHANGE = 1  # Seconds a gap must move to be reported
+
+
+def snapshot_arrays(processed_data):
+    """Reduce processed standings to the arrays the diff compares: positions, times, gaps and stages"""
+    sorted_participants, latest_stage, _ = processed_data
+    names = [name for name, _ in sorted_participants]
+    seconds = np.array([data['time_seconds'] for _, data in sorted_participants], dtype=np.int64)
+    return {
+        'names': names,
+        'index': {name: row for row, name in enumerate(names)},
+        'positions': np.array([data['position'] for _, data in sorted_participants], dtype=np.int32),
+        'seconds': seconds,
+        # Gap to the fastest current time (an empty snapshot has no gaps)
+        'gaps': seconds - seconds.min() if len(seconds) else seconds,
+        'stages': np.array([data['stage'] for _, data in sorted_participants], dtype=np.int32),
+        'latest_stage': latest_stage
+    }
+
+def diff_snapshots(previous, current):
+    """Compare two snapshot arrays and return change events.
+
+    Events are small dicts: ``position`` (from/to), ``gap`` (change in seconds,
+    negative = gained time on the leader), ``stage`` (newly completed stages
+    with how many participants have a time for them) and ``leader`` (a new
+    participant in first place, always reported however many others moved).
+    """
+    names = current['names']
+    previous_rows = np.array([previous['index'].get(name, -1) for name in names], dtype=np.int64)
+    known = previous_rows >= 0
+    rows = np.flatnonzero(known)
+    matched = previous_rows[known]
+
+    events = []
+    for stage in range(previous['latest_stage'] + 1, current['latest_stage'] + 1):
+        events.append({'type': 'stage', 'stage': stage, 'participants': int((current['stages'] >= stage).sum())})
+
+    # A new leader is compared directly, outside the per-diff cap on position moves
+    previous_leaders = [previous['names'][row] for row in np.flatnonzero(previous['positions'] == 1)]
+    for row in np.flatnonzero(current['positions'] == 1):
+        if names[row] not in previous_leaders:
+            events.append({
+                'type': 'leader', 'participant': names[row], 'previous': previous_leaders,
+                'from': int(previous['positions'][previous_rows[row]]) if known[row] else None
+            })
+
+    moves = current['positions'][rows] - previous['positions'][matched]
+    moved = np.flatnonzero(moves != 0)
+    gap_changes = current['gaps'][rows] - previous['gaps'][matched]
+    # Gap swings of the leader are the field moving, not the leader: report non-leaders only
+    changed_gaps = np.flatnonzero((np.abs(gap_changes) >= MIN_GAP_CHANGE) & (current['positions'][rows] > 1))
+
+    # Biggest position moves first, then biggest gap swings, capped per snapshot
+    moved = moved[np.argsort(-np.abs(moves[moved]), kind='stable')]
+    changed_gaps = changed_gaps[np.argsort(-np.abs(gap_changes[changed_gaps]), kind='stable')]
+    budget = MAX_EVENTS_PER_DIFF
+    for i in moved[:budget]:
+        events.append({
+            'type': 'position', 'participant': names[rows[i]],
+            'from': int(previous['positions'][matched[i]]), 'to': int(current['positions'][rows[i]])
+        })
+    budget -= min(len(moved), budget)
+    for i in changed_gaps[:budget]:
+        events.append({
+            'type': 'gap', 'participant': names[rows[i]],
+            'change': int(gap_changes[i]), 'gap': int(current['gaps'][rows[i]])
+        })
+
+    for row in np.flatnonzero(~known):
+        events.append({'type': 'joined', 'participant': names[row], 'to': int(current['positions'][row])})
+    return events
+
+
+class ChangeFeed:
+    """Ring buffer of change events between consecutive snapshots, shared by all sessions.
+
+    Every event gets an increasing ``sequence`` number, so a session can ask for
+    what happened since the last sequence it displayed.
+    """
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.events = deque(maxlen=max_events)
+        self.sequence = 0
+        self.last_token = None
+        self.last_arrays = None
+        self.lock = threading.Lock()
+
+    def record(self, token, processed_data):
+        """Diff a snapshot against the previous one (once per change token) and append the events"""
+        with self.lock:
+            if processed_data is None or (token is not None and token == self.last_token):
+                return []
+            arrays = snapshot_arrays(processed_data)
+            events = diff_snapshots(self.last_arrays, arrays) if self.last_arrays is not None else []
+            recorded_at = time.time()
+            for event in events:
+                self.sequence += 1
+                event.update(sequence=self.sequence, recorded_at=recorded_at)
+                self.events.append(event)
+            self.last_token = token
+            self.last_arrays = arrays
+            return events
+
+    def since(self, sequence):
+        """Events newer than ``sequence``, oldest first"""
+        with self.lock:
+            return [event for event in self.events if event['sequence'] > sequence]
+
+    def recent(self, limit):
+        """The newest ``limit`` events, newest first"""
+        with self.lock:
+            return list(self.events)[::-1][:limit]
+
+    def changed_participants(self, sequence):
+        """Participants with an event newer than ``sequence`` (the rows a renderer needs to update)"""
+        return {event['participant'] for event in self.since(sequence) if 'participant' in event}
@@ -0,0 +1,124 @@
+"""Compact storage for stage-by-stage cumulative times.
+
+``StageTable`` keeps a participant name index, an int32 participants x stages
+matrix of cumulative seconds and a mask of which stages have a time. It is also
+a read-only mapping, so code written against the old nested-dict layout
+(``stage_data[participant][stage]['time_seconds']``) keeps working; the
+``'time'`` strings are only formatted when such a lookup asks for them.
+
+Run ``python stage_table.py`` for a memory comparison at 10k teams.
+"""
+import tracemalloc
+from collections.abc import Mapping
+
+import numpy as np
+
+
+def format_stage_time(seconds):
+    """Format seconds as the sheet's H:MM:SS"""
+    return f"{seconds // 3600}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+class ParticipantStages(Mapping):
+    """Read-only ``{stage: {'time': ..., 'time_seconds': ...}}`` view of one participant's row"""
+
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __contains__(self, stage):
+        column = stage - 1 if isinstance(stage, (int, np.integer)) else -1
+        return 0 <= column < self.table.present.shape[1] and bool(self.table.present[self.row, column])
+
+    def __getitem__(self, stage):
+        if stage not in self:
+            raise KeyError(stage)
+        seconds = int(self.table.seconds[self.row, stage - 1])
+        return {'time': format_stage_time(seconds), 'time_seconds': seconds}
+
+    def __iter__(self):
+        return iter((np.flatnonzero(self.table.present[self.row]) + 1).tolist())
+
+    def __len__(self):
+        return int(self.table.present[self.row].sum())
+
+
+class StageTable(Mapping):
+    """Participants x stages cumulative times backed by an int32 matrix and a missing-value mask"""
+
+    __slots__ = ('names', 'index', 'seconds', 'present')
+
+    def __init__(self, names, seconds, present):
+        self.names = list(names)
+        self.index = {name: row for row, name in enumerate(self.names)}
+        self.seconds = np.ascontiguousarray(seconds, dtype=np.int32)
+        self.present = np.ascontiguousarray(present, dtype=bool)
+
+    def __reduce__(self):
+        # Pickle (and Streamlit's cache hashing) only needs the arrays, not the derived index
+        return (StageTable, (self.names, self.seconds, self.present))
+
+    def __getitem__(self, participant):
+        return ParticipantStages(self, self.index[participant])
+
+    def __contains__(self, participant):
+        return participant in self.index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def cumulative_matrix(self, total_stages):
+        """Float matrix of cumulative seconds with NaN for missing stages, padded or cut to ``total_stages``"""
+        cumulative = np.full((len(self.names), total_stages), np.nan)
+        stages = min(total_stages, self.seconds.shape[1])
+        cumulative[:, :stages] = np.where(self.present[:, :stages], self.seconds[:, :stages], np.nan)
+        return cumulative
+
+    def nbytes(self):
+        """Bytes held by the arrays (the name index is extra)"""
+        return self.seconds.nbytes + self.present.nbytes
+
+
+def memory_comparison(teams=10_000, stages=21, seed=0):
+    """Traced memory of the nested-dict layout vs. a StageTable for a synthetic league"""
+    rng = np.random.default_rng(seed)
+    cumulative = np.cumsum(rng.integers(30, 900, size=(teams, stages)), axis=1)
+    names = [f"Team {team}" for team in range(teams)]
+    cumulative_list = cumulative.tolist()
+
+    tracemalloc.start()
+    nested = {
+        name: {
+            stage: {'time': format_stage_time(seconds), 'time_seconds': seconds}
+            for stage, seconds in enumerate(row, 1)
+        }
+        for name, row in zip(names, cumulative_list)
+    }
+    nested_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    table = StageTable(names, cumulative, np.ones(cumulative.shape, dtype=bool))
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del nested, table
+    return {
+        'teams': teams,
+        'stages': stages,
+        'nested_dict_mb': round(nested_bytes / 1e6, 2),
+        'stage_table_mb': round(table_bytes / 1e6, 2),
+        'bytes_per_cell_nested': round(nested_bytes / (teams * stages), 1),
+        'bytes_per_cell_table': round(table_bytes / (teams * stages), 1),
+        'ratio': round(nested_bytes / max(table_bytes, 1), 1)
+    }
+
+
+if __name__ == "__main__":
+    for key, value in memory_comparison().items():
+        print(f"{key}: {value}")
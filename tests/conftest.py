@@ -0,0 +1,51 @@
+import os
+
+import pandas as pd
+import pytest
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+STANDINGS_CSV = os.path.join(DATA_DIR, "standings.csv")
+
+
+@pytest.fixture
+def standings_sheet():
+    """The sample league sheet as the app reads it (names in column A, stages 1-21 after)"""
+    return pd.read_csv(STANDINGS_CSV)
+
+
+def legacy_process_data(df, participants=('Jeremy', 'Leo', 'Charles', 'Aaron', 'Nate')):
+    """The app's original row-by-row process_data (before core.py), minus Streamlit, as a reference"""
+    def time_to_seconds(time_str):
+        hours, minutes, seconds = (int(part) for part in str(time_str).split(':'))
+        return hours * 3600 + minutes * 60 + seconds
+
+    participant_data = {}
+    stage_by_stage_data = {}
+    latest_stage = 1
+    for _, row in df.iterrows():
+        participant_name = str(row.iloc[0]).strip() if pd.notna(row.iloc[0]) else ""
+        if participant_name not in participants:
+            continue
+        stage_times = []
+        all_stage_data = {}
+        for col_idx in range(1, min(22, len(row))):
+            time_val = row.iloc[col_idx]
+            if pd.notna(time_val) and str(time_val).strip() != "0:00:00" and str(time_val).strip() != "":
+                stage_times.append((col_idx, time_val))
+                all_stage_data[col_idx] = {'time': time_val, 'time_seconds': time_to_seconds(time_val)}
+                latest_stage = max(latest_stage, col_idx)
+        if stage_times:
+            participant_data[participant_name] = {
+                'time': stage_times[-1][1],
+                'time_seconds': time_to_seconds(stage_times[-1][1]),
+                'stage': latest_stage
+            }
+            stage_by_stage_data[participant_name] = all_stage_data
+
+    sorted_participants = sorted(participant_data.items(), key=lambda item: item[1]['time_seconds'])
+    leader_time = sorted_participants[0][1]['time_seconds']
+    for position, (name, data) in enumerate(sorted_participants, 1):
+        gap = data['time_seconds'] - leader_time
+        data['gap'] = "Leader" if gap == 0 else f"+{gap // 3600}:{(gap % 3600) // 60:02d}:{gap % 60:02d}"
+        data['position'] = position
+    return sorted_participants, latest_stage, stage_by_stage_data
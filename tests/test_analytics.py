@@ -0,0 +1,83 @@
+import numpy as np
+
+from analytics import classifications, countback_keys, gc_rank_matrix, rank_columns, standings_ranks, tie_aware_ranks
+
+nan = np.nan
+
+
+def test_equal_gc_times_are_separated_by_countback():
+    cumulative = np.array([
+        [100, 210],  # Won stage 1
+        [105, 210],  # Same time, no stage win
+        [101, 200]   # Won stage 2
+    ], dtype=float)
+
+    wins, best_placing, placing_sum = countback_keys(cumulative)
+    assert (-wins[:, -1]).tolist() == [1, 0, 1]
+    assert best_placing[:, -1].tolist() == [1, 2, 1]
+    assert placing_sum[:, -1].tolist() == [4, 5, 3]
+
+    assert gc_rank_matrix(cumulative).tolist() == [[1, 2], [3, 3], [2, 1]]
+    assert standings_ranks(cumulative).tolist() == [2, 3, 1]
+
+
+def test_countback_falls_through_to_best_placing_and_placing_sum():
+    # Equal times and one stage win each; best placing then sum of placings decide
+    cumulative = np.array([
+        [100, 200, 300],  # Stage placings 1, 2, 2
+        [110, 200, 300],  # Stage placings 3, 1, 2
+        [105, 215, 295]   # Stage placings 2, 3, 1
+    ], dtype=float)
+    assert gc_rank_matrix(cumulative)[:, -1].tolist() == [2, 3, 1]
+    assert gc_rank_matrix(cumulative)[:, 1].tolist() == [1, 2, 3]
+
+
+def test_ties_on_every_key_share_the_lower_rank():
+    cumulative = np.array([[100, 200], [100, 200], [110, 220], [90, 230]], dtype=float)
+    assert gc_rank_matrix(cumulative).tolist() == [[2, 1], [2, 1], [4, 3], [1, 4]]
+    assert tie_aware_ranks(np.array([[5.0], [3.0], [3.0], [1.0]]), []).ravel().tolist() == [4, 2, 2, 1]
+
+
+def test_missing_stages_stay_unranked_but_keep_the_latest_standing():
+    cumulative = np.array([
+        [100, 200],
+        [110, nan],  # Missed stage 2: no GC position there, standings use the stage 1 time
+        [nan, nan]   # No times at all
+    ], dtype=float)
+
+    ranks = gc_rank_matrix(cumulative)
+    assert ranks[:, 0].tolist()[:2] == [1, 2] and np.isnan(ranks[2, 0])
+    assert ranks[0, 1] == 1 and np.isnan(ranks[1:, 1]).all()
+
+    standings = standings_ranks(cumulative)
+    assert standings[:2].tolist() == [2, 1]
+    assert np.isnan(standings[2])
+
+
+def positions(values):
+    return [None if np.isnan(value) else int(value) for value in values]
+
+
+def test_classifications_order_and_missing_stages():
+    splits = np.array([
+        [100, 200, 300],
+        [110, 190, 310],
+        [120, 210, nan],  # Missed the last stage
+        [100, 220, 290],
+        [nan, nan, nan]   # No stage raced
+    ], dtype=float)
+    results = classifications(splits, rank_columns(splits), form_stages=2)
+
+    assert results['stage_wins'].tolist() == [1, 1, 0, 2, 0]
+    assert positions(results['stage_wins_position']) == [2, 2, 4, 1, 4]
+
+    assert results['points'].tolist() == [110, 90, 38, 118, 0]
+    assert positions(results['points_position']) == [2, 3, 4, 1, 5]
+
+    # Spread of each split around the stage median; two stages are enough to be ranked
+    assert np.round(results['consistency'][:4], 2).tolist() == [2.36, 10.8, 5.0, 10.8]
+    assert positions(results['consistency_position']) == [1, 3, 2, 3, None]
+
+    # Form needs every one of the last stages
+    assert positions(results['form']) == [500, 500, None, 510, None]
+    assert positions(results['form_position']) == [1, 1, None, 3, None]
@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import core
+from conftest import STANDINGS_CSV, legacy_process_data
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_process_data_matches_the_original_app(standings_sheet):
+    sorted_participants, latest_stage, _ = core.process_data(standings_sheet)
+    expected_participants, expected_stage, _ = legacy_process_data(standings_sheet)
+
+    assert latest_stage == expected_stage == 4
+    assert sorted_participants == expected_participants
+    assert [name for name, _ in sorted_participants] == ['Aaron', 'Jeremy', 'Leo', 'Charles', 'Nate']
+
+
+def test_process_data_without_a_participant_list_skips_note_rows(standings_sheet):
+    named = core.process_data(standings_sheet)
+    every_row = core.process_data(standings_sheet, participants=None)
+    assert every_row[0] == named[0]
+    assert list(every_row[2]) == ['Jeremy', 'Leo', 'Charles', 'Aaron', 'Nate']
+
+
+def test_process_data_rejects_a_sheet_without_participants(standings_sheet):
+    with pytest.raises(core.StandingsError, match="No participant data"):
+        core.process_data(standings_sheet, participants=['Nobody'])
+
+
+def test_standings_frame(standings_sheet):
+    frame = core.standings_frame(core.process_data(standings_sheet))
+    assert frame['participant'].tolist() == ['Aaron', 'Jeremy', 'Leo', 'Charles', 'Nate']
+    assert frame['position'].tolist() == [1, 2, 3, 4, 5]
+    assert frame.loc[1, ['time', 'time_seconds', 'gap', 'stage']].tolist() == ["17:40:02", 63602, "+4:40:04", 4]
+    # Stage wins: Leo stages 1 and 3, Aaron stage 2, Jeremy stage 4 (Charles' split spans stages 3-4)
+    assert dict(zip(frame['participant'], frame['stage_wins'])) == {'Aaron': 1, 'Jeremy': 1, 'Leo': 2, 'Charles': 0, 'Nate': 0}
+
+
+def run_cli(*args):
+    return subprocess.run([sys.executable, "cli.py", *args], cwd=REPO_DIR, capture_output=True, text=True, timeout=120)
+
+
+def test_cli_writes_json_standings():
+    result = run_cli(STANDINGS_CSV, "--workers", "1")
+    assert result.returncode == 0, result.stderr
+    payload = json.loads(result.stdout)
+    assert payload['latest_stage'] == 4
+    assert [row['participant'] for row in payload['standings']] == ['Aaron', 'Jeremy', 'Leo', 'Charles', 'Nate']
+    assert payload['gc_ranks']['Leo']['stage_01'] == 1
+
+
+def test_cli_reports_a_failing_league_and_keeps_the_others(tmp_path):
+    missing = str(tmp_path / "missing.csv")
+    result = run_cli(STANDINGS_CSV, missing, "--format", "csv", "--workers", "2")
+    assert result.returncode == 1
+    assert missing in result.stderr
+    assert result.stdout.splitlines()[0].startswith("league,position,participant")
+    assert len(result.stdout.splitlines()) == 6
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pandas as pd
+
+import core
+from exports import ExportCache
+
+
+def processed():
+    sheet = pd.DataFrame([
+        ["Leo", "1:00:00", "2:05:40"],
+        ["Nate", "1:00:30", "2:05:20"],
+        ["Aaron", "1:01:00", ""]
+    ], columns=["Stage", "1", "2"])
+    return core.process_data(sheet, ["Leo", "Nate", "Aaron"])
+
+
+def test_split_frame_has_one_nullable_column_per_stage():
+    splits = core.split_frame(processed())
+    assert list(splits.columns) == ['stage_01', 'stage_02']
+    assert splits.loc['Leo'].tolist() == [3600, 3940]
+    assert splits.loc['Nate'].tolist() == [3630, 3890]
+    assert splits.loc['Aaron', 'stage_01'] == 3660
+    assert pd.isna(splits.loc['Aaron', 'stage_02'])
+
+
+def test_stage_rank_frame_ranks_each_stage_separately():
+    ranks = core.stage_rank_frame(processed())
+    assert ranks['stage_01'].to_dict() == {'Leo': 1, 'Nate': 2, 'Aaron': 3}
+    assert ranks.loc[['Nate', 'Leo'], 'stage_02'].tolist() == [1, 2]
+    assert pd.isna(ranks.loc['Aaron', 'stage_02'])
+
+
+def test_cache_drops_the_least_recently_used_files_beyond_the_byte_budget():
+    cache = ExportCache(max_bytes=10)
+    cache.put('a', b"1234")
+    cache.put('b', b"1234")
+    cache.get('a')  # 'b' is now the least recently used
+    cache.put('c', b"1234")
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b"1234" and cache.get('c') == b"1234"
+    assert cache.total_bytes == 8
+
+
+def test_file_bigger_than_the_budget_is_served_but_not_kept():
+    cache = ExportCache(max_bytes=10)
+    cache.put('small', b"1234")
+
+    assert cache.get_or_render('big', lambda: b"x" * 11) == b"x" * 11
+    assert cache.get('big') is None
+    assert cache.get('small') == b"1234"
+
+
+def test_concurrent_requests_render_a_file_once():
+    cache = ExportCache()
+    renders = []
+
+    def render():
+        renders.append(1)
+        time.sleep(0.05)
+        return b"standings"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_render('standings', render))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(renders) == 1
+    assert results == [b"standings"] * 8
@@ -0,0 +1,51 @@
+import shutil
+from concurrent.futures import Future
+
+import pytest
+
+from conftest import STANDINGS_CSV
+from league_refresh import RefreshScheduler
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    good = str(tmp_path / "good.csv")
+    shutil.copy(STANDINGS_CSV, good)
+    refresh = RefreshScheduler([good, str(tmp_path / "missing.csv")], workers=2)
+    yield refresh
+    refresh.close()
+
+
+def test_one_cycle_stores_good_leagues_and_errors(scheduler):
+    good, missing = scheduler.sources
+    assert scheduler.refresh(timeout=60) == []
+    assert scheduler.in_flight == {}
+    assert [name for name, _ in scheduler.processed_data(good)[0]][:2] == ['Aaron', 'Jeremy']
+    assert missing in scheduler.errors and scheduler.processed_data(missing) is None
+
+    # Unchanged sheet: the worker skips processing and the stored snapshot stays
+    snapshot = scheduler.snapshots[good]
+    assert scheduler.refresh(timeout=60) == []
+    assert scheduler.snapshots[good] is snapshot
+
+
+def test_league_still_processing_is_not_submitted_again(scheduler):
+    good, missing = scheduler.sources
+    pending = Future()
+    scheduler.in_flight[good] = pending
+
+    assert scheduler.submit_cycle() == [missing]
+    assert scheduler.in_flight[good] is pending
+
+
+def test_worker_failure_never_leaves_a_league_in_flight(scheduler):
+    good, _ = scheduler.sources
+    failed = Future()
+    scheduler.in_flight[good] = failed
+    failed.add_done_callback(lambda future: scheduler.store(good, future))
+
+    failed.set_exception(RuntimeError("worker died"))
+
+    assert good not in scheduler.in_flight
+    assert scheduler.errors[good] == "RuntimeError: worker died"
+    assert scheduler.submit_cycle() == list(scheduler.sources)
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+import notifier
+from notifier import Notifier, RateLimiter, StubReceiver, WebhookTarget
+
+
+@pytest.fixture(autouse=True)
+def fast_delivery(monkeypatch):
+    monkeypatch.setattr(notifier, 'BATCH_WINDOW', 0.05)
+    monkeypatch.setattr(notifier, 'SEND_BASE_DELAY', 0.01)
+
+
+@pytest.fixture
+def receiver():
+    stub = StubReceiver()
+    yield stub
+    stub.close()
+
+
+def stage_notifications(count):
+    return [{'kind': 'stage_complete', 'stage': stage, 'text': f"🏁 Stage {stage} results are in"} for stage in range(1, count + 1)]
+
+
+def test_webhook_and_email_payloads(receiver):
+    dispatcher = Notifier([
+        WebhookTarget(receiver.url("/webhook"), rate=100, burst=10),
+        WebhookTarget(receiver.url("/email"), style='email', recipients=["league@example.com"], rate=100, burst=10)
+    ])
+    dispatcher.submit(stage_notifications(3))
+    dispatcher.flush(10)
+    dispatcher.close()
+
+    payloads = dict(receiver.received)
+    assert [item['stage'] for item in payloads["/webhook"]['notifications']] == [1, 2, 3]
+    assert 'queued_at' not in payloads["/webhook"]['notifications'][0]
+    assert payloads["/email"] == {
+        'to': ["league@example.com"],
+        'subject': "🏁 Stage 1 results are in (+2 more)",
+        'text': "🏁 Stage 1 results are in\n🏁 Stage 2 results are in\n🏁 Stage 3 results are in"
+    }
+
+
+def test_rate_limiter_allows_a_burst_then_paces_sends():
+    async def sends(limiter, count):
+        started = time.monotonic()
+        for _ in range(count):
+            await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(sends(RateLimiter(rate=20, burst=3), 3)) < 0.05
+    # Three sends from the burst, then three more at 20 per second
+    assert asyncio.run(sends(RateLimiter(rate=20, burst=3), 6)) >= 0.14
+
+
+def test_retries_then_delivers():
+    flaky = StubReceiver(fail_first=2)
+    dispatcher = Notifier([WebhookTarget(flaky.url(), rate=100, burst=10)])
+    dispatcher.submit(stage_notifications(1))
+    dispatcher.flush(10)
+    metrics = dispatcher.metrics()
+    dispatcher.close()
+    flaky.close()
+
+    assert (metrics['retries'], metrics['sent'], metrics['failed']) == (2, 1, 0)
+    assert len(flaky.received) == 1
+
+
+def test_failing_target_does_not_block_the_others(receiver):
+    down = StubReceiver(fail_first=100, delay=0.3)
+    dispatcher = Notifier([
+        WebhookTarget(down.url("/down"), rate=100, burst=10),
+        WebhookTarget(receiver.url("/up"), rate=100, burst=10)
+    ])
+    dispatcher.submit(stage_notifications(2))
+
+    deadline = time.monotonic() + 2
+    while not receiver.received and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert receiver.received, "the healthy target waited on the failing one"
+    assert dispatcher.metrics()['failed'] == 0  # The failing target is still retrying
+
+    dispatcher.flush(10)
+    metrics = dispatcher.metrics()
+    dispatcher.close()
+    down.close()
+    assert metrics['sent'] == 2 and metrics['failed'] == 2
+    assert metrics['queue_depth'] == {f"webhook:{down.url('/down')}": 0, f"webhook:{receiver.url('/up')}": 0}
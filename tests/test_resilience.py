@@ -0,0 +1,35 @@
+import pytest
+import requests
+
+from resilience import CircuitBreaker, ResilientFetcher, call_with_retries
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+@pytest.mark.parametrize("status, calls", [(404, 1), (403, 1), (429, 3), (503, 3)])
+def test_only_transient_http_errors_are_retried(status, calls):
+    attempts = []
+
+    def fetch():
+        attempts.append(1)
+        raise http_error(status)
+
+    with pytest.raises(requests.HTTPError):
+        call_with_retries(fetch, sleep=lambda _: None)
+    assert len(attempts) == calls
+
+
+def test_client_errors_do_not_open_the_circuit(tmp_path):
+    class MissingSheet:
+        def fetch(self):
+            raise http_error(404)
+
+    fetcher = ResilientFetcher(MissingSheet(), str(tmp_path / "snapshot.pkl"), CircuitBreaker(failure_threshold=1))
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            fetcher.fetch()
+    assert fetcher.breaker.state() == "closed"
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from rosters import join_rosters_to_results
+
+
+def test_join_keeps_a_results_team_column():
+    results = pd.DataFrame({
+        'Rider': ["POGAČAR Tadej", "VINGEGAARD Jonas", "EVENEPOEL Remco"],
+        'Team': ["UAE Team Emirates", "Visma | Lease a Bike", "Soudal Quick-Step"],
+        'Time': ["76:00:32", "76:06:49", "76:10:16"]
+    })
+    team_rosters = {'Leo': ["Tadej Pogacar", "Remco Evenepoel"], 'Nate': ["Jonas Vingegaard", "Nobody Atall"]}
+
+    matches, unmatched = join_rosters_to_results(team_rosters, results)
+
+    assert list(matches.columns) == ['Fantasy Team', 'Roster Rider', 'Rider', 'Team', 'Time']
+    assert matches['Fantasy Team'].tolist() == ['Leo', 'Leo', 'Nate']
+    assert matches['Team'].tolist() == ["UAE Team Emirates", "Soudal Quick-Step", "Visma | Lease a Bike"]
+    assert unmatched == ["Nobody Atall"]
+
+
+def test_join_prefixes_result_columns_that_clash():
+    results = pd.DataFrame({'Rider': ["Tadej Pogacar"], 'Fantasy Team': ["x"]})
+
+    matches, _ = join_rosters_to_results({'Leo': ["Tadej Pogacar"]}, results)
+
+    assert list(matches.columns) == ['Fantasy Team', 'Roster Rider', 'Rider', 'Result Fantasy Team']
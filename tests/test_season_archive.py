@@ -0,0 +1,17 @@
+import numpy as np
+
+from season_archive import SeasonArchive, archive_season
+from stage_table import StageTable
+
+
+def test_season_in_progress_is_provisional_until_complete(tmp_path):
+    table = StageTable(["Leo", "Nate"], np.array([[3600, 0], [3630, 0]]), np.array([[True, False], [True, False]]))
+
+    archive_season(2026, table, 2, str(tmp_path), complete=False)
+    summaries = SeasonArchive(str(tmp_path)).summaries()
+    assert not summaries['complete'].any()
+
+    archive_season(2026, table, 2, str(tmp_path))
+    summaries = SeasonArchive(str(tmp_path)).summaries()
+    assert summaries['complete'].all()
+    assert summaries['final_position'].tolist() == [1, 2]
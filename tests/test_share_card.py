@@ -0,0 +1,21 @@
+import os
+
+from share_card import get_share_card
+
+
+def standings(leader):
+    return [(leader, {'time': "1:00:00", 'time_seconds': 3600, 'gap': "-", 'position': 1}), ("Nate", {'time': "1:00:30", 'time_seconds': 3630, 'gap': "+0:30", 'position': 2})]
+
+
+def test_card_in_use_survives_pruning(tmp_path):
+    card_dir = str(tmp_path)
+    _, kept = get_share_card(standings("Leo"), 1, 21, "Fantasy Tour", card_dir, max_cards=2)
+    _, older = get_share_card(standings("Aaron"), 1, 21, "Fantasy Tour", card_dir, max_cards=2)
+    os.utime(older, (100, 100))
+    os.utime(kept, (0, 0))  # Oldest on disk...
+    get_share_card(standings("Leo"), 1, 21, "Fantasy Tour", card_dir, max_cards=2)  # ...until served again
+
+    get_share_card(standings("Charles"), 1, 21, "Fantasy Tour", card_dir, max_cards=2)
+
+    assert os.path.exists(kept)
+    assert not os.path.exists(older)
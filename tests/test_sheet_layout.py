@@ -0,0 +1,71 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import sheet_layout
+from sheet_layout import LEGACY_LAYOUT, detect_layout, find_layout
+
+
+@pytest.fixture(autouse=True)
+def fresh_layouts(monkeypatch):
+    monkeypatch.setattr(sheet_layout, 'known_layouts', {})
+
+
+def test_detect_layout_in_the_csv_header():
+    df = pd.DataFrame([["Leo", "1:00:00", "2:00:00"]], columns=["Stage", "1", "2"])
+    assert detect_layout(df) == {'header_row': None, 'stage_start': 1, 'stage_count': 2, 'name_column': 0}
+
+
+def test_detect_layout_below_a_title_and_right_of_a_rank_column():
+    df = pd.DataFrame([
+        ["Fantasy Tour", "", "", ""],
+        ["#", "Team", "1", "2"],
+        ["1", "Leo", "1:00:00", "2:00:00"],
+        ["2", "Nate", "1:00:30", "2:00:40"]
+    ], columns=["A", "B", "C", "D"])
+    # Both left columns are filled; the one next to the stages holds the names
+    assert detect_layout(df) == {'header_row': 1, 'stage_start': 2, 'stage_count': 2, 'name_column': 1}
+
+
+def test_sheet_without_a_stage_header_falls_back_to_the_legacy_layout():
+    df = pd.DataFrame([["Leo", "1:00:00"]], columns=["Name", "Time"])
+    assert detect_layout(df) is None
+    assert find_layout(df) == LEGACY_LAYOUT
+    assert sheet_layout.known_layouts == {}
+
+
+def test_known_layout_is_reused_until_the_header_changes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(sheet_layout, 'detect_layout', lambda df: calls.append(1) or detect_layout(df))
+    df = pd.DataFrame([["Leo", "1:00:00", "2:00:00"]], columns=["Stage", "1", "2"])
+
+    first = find_layout(df)
+    df.loc[1] = ["Nate", "1:00:30", ""]  # New data under the same header
+    assert find_layout(df) is first
+    assert len(calls) == 1
+
+    find_layout(df.rename(columns={"2": "Stage 2"}))
+    assert len(calls) == 2
+
+
+def test_concurrent_lookups_share_the_known_layouts(monkeypatch):
+    monkeypatch.setattr(sheet_layout, 'MAX_KNOWN_LAYOUTS', 2)
+    sheets = [pd.DataFrame([["Leo"] + ["1:00:00"] * stages], columns=["Stage"] + [str(s) for s in range(1, stages + 1)]) for stages in range(1, 6)]
+    errors = []
+
+    def lookups():
+        try:
+            for _ in range(10):
+                for df in sheets:
+                    find_layout(df)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=lookups) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(sheet_layout.known_layouts) <= 2
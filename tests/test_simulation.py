@@ -0,0 +1,33 @@
+import numpy as np
+
+from simulation import simulate_final_positions
+
+nan = np.nan
+SPLITS = np.array([
+    [3600, 4000, 3900],
+    [3650, 3950, nan],  # Missing split filled with this participant's mean
+    [3700, 4100, 3800]
+], dtype=float)
+
+
+def test_probabilities_sum_to_one_per_participant_and_position():
+    probabilities = simulate_final_positions([11500, 11530, 11600], SPLITS, 5, trials=30_000, seed=1)
+    assert probabilities.shape == (3, 3)
+    assert np.allclose(probabilities.sum(axis=1), 1)
+    assert np.allclose(probabilities.sum(axis=0), 1)
+
+
+def test_same_seed_same_result_whatever_the_worker_count():
+    single = simulate_final_positions([11500, 11530, 11600], SPLITS, 5, trials=50_000, seed=7)
+    pooled = simulate_final_positions([11500, 11530, 11600], SPLITS, 5, trials=50_000, seed=7, workers=2)
+    assert np.array_equal(single, pooled)
+
+
+def test_runaway_leader_wins_almost_surely():
+    probabilities = simulate_final_positions([11500, 15000, 15100], SPLITS, 3, trials=20_000, seed=3)
+    assert probabilities[0, 0] > 0.999
+
+
+def test_finished_race_is_deterministic():
+    probabilities = simulate_final_positions([11530, 11500, 11600], SPLITS, 0, seed=None)
+    assert probabilities.tolist() == [[0, 1, 0], [1, 0, 0], [0, 0, 1]]
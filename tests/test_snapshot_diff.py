@@ -0,0 +1,63 @@
+import pandas as pd
+
+import core
+import snapshot_diff
+from notifier import notifications_from_events
+from snapshot_diff import ChangeFeed, diff_snapshots, snapshot_arrays
+
+
+def sheet(rows):
+    """Sheet-shaped frame: a name column then cumulative H:MM:SS times for stages 1-3"""
+    return pd.DataFrame(
+        [[name] + list(times) + [""] * (3 - len(times)) for name, times in rows],
+        columns=["Stage", "1", "2", "3"]
+    )
+
+
+def test_gaps_are_measured_from_the_leader():
+    processed = core.process_data(sheet([("Leo", ["1:00:00"]), ("Nate", ["1:00:30"])]), ["Leo", "Nate"])
+    arrays = snapshot_arrays(processed)
+    assert dict(zip(arrays['names'], arrays['gaps'].tolist())) == {'Leo': 0, 'Nate': 30}
+
+
+def test_diff_of_two_processed_snapshots():
+    participants = ["Leo", "Nate", "Aaron"]
+    before = core.process_data(sheet([
+        ("Leo", ["1:00:00"]), ("Nate", ["1:00:30"]), ("Aaron", ["1:01:00"])
+    ]), participants)
+    after = core.process_data(sheet([
+        ("Leo", ["1:00:00", "2:05:40"]), ("Nate", ["1:00:30", "2:05:20"]), ("Aaron", ["1:01:00", "2:06:40"])
+    ]), participants)
+
+    events = diff_snapshots(snapshot_arrays(before), snapshot_arrays(after))
+
+    assert {'type': 'stage', 'stage': 2, 'participants': 3} in events
+    positions = {event['participant']: (event['from'], event['to']) for event in events if event['type'] == 'position'}
+    assert positions == {'Nate': (2, 1), 'Leo': (1, 2)}
+    # Only real gap swings are reported, never a participant's stage split
+    gaps = {event['participant']: (event['change'], event['gap']) for event in events if event['type'] == 'gap'}
+    assert gaps == {'Leo': (20, 20), 'Aaron': (20, 80)}
+
+
+def test_change_feed_records_each_token_once():
+    feed = ChangeFeed()
+    first = core.process_data(sheet([("Leo", ["1:00:00"]), ("Nate", ["1:00:30"])]), ["Leo", "Nate"])
+    second = core.process_data(sheet([("Leo", ["1:00:00", "2:00:50"]), ("Nate", ["1:00:30", "2:00:40"])]), ["Leo", "Nate"])
+
+    assert feed.record("a", first) == []
+    events = feed.record("b", second)
+    assert [event['sequence'] for event in events] == list(range(1, len(events) + 1))
+    assert feed.record("b", second) == []
+    assert feed.changed_participants(0) == {'Leo', 'Nate'}
+
+
+def test_new_leader_is_reported_beyond_the_event_cap(monkeypatch):
+    monkeypatch.setattr(snapshot_diff, 'MAX_EVENTS_PER_DIFF', 0)
+    before = core.process_data(sheet([("Leo", ["1:00:00"]), ("Nate", ["1:00:30"])]), ["Leo", "Nate"])
+    after = core.process_data(sheet([("Leo", ["1:00:00", "2:00:50"]), ("Nate", ["1:00:30", "2:00:40"])]), ["Leo", "Nate"])
+
+    events = diff_snapshots(snapshot_arrays(before), snapshot_arrays(after))
+
+    assert not [event for event in events if event['type'] == 'position']
+    assert {'type': 'leader', 'participant': 'Nate', 'previous': ['Leo'], 'from': 2} in events
+    assert [item['kind'] for item in notifications_from_events(events)] == ['stage_complete', 'leader_change']
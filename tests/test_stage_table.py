@@ -0,0 +1,53 @@
+import pickle
+
+import numpy as np
+import pytest
+
+import core
+from conftest import legacy_process_data
+from stage_table import StageTable
+
+
+@pytest.fixture
+def table():
+    seconds = np.array([[3600, 7300, 0], [3630, 0, 11000]])
+    present = np.array([[True, True, False], [True, False, True]])
+    return StageTable(["Leo", "Nate"], seconds, present)
+
+
+def test_participant_lookups(table):
+    assert "Leo" in table and "Aaron" not in table
+    assert table["Leo"][2] == {'time': "2:01:40", 'time_seconds': 7300}
+    with pytest.raises(KeyError):
+        table["Aaron"]
+
+
+def test_iteration_and_len_skip_missing_stages(table):
+    assert list(table) == ["Leo", "Nate"] and len(table) == 2
+    assert list(table["Nate"]) == [1, 3] and len(table["Nate"]) == 2
+    assert 2 not in table["Nate"] and 4 not in table["Nate"] and "1" not in table["Nate"]
+    with pytest.raises(KeyError):
+        table["Nate"][2]
+    assert table["Leo"].get(3) is None
+
+
+def test_cumulative_matrix_pads_and_cuts(table):
+    assert np.array_equal(table.cumulative_matrix(4), [[3600, 7300, np.nan, np.nan], [3630, np.nan, 11000, np.nan]], equal_nan=True)
+    assert np.array_equal(table.cumulative_matrix(1), [[3600], [3630]])
+
+
+def test_pickles_without_the_name_index(table):
+    restored = pickle.loads(pickle.dumps(table))
+    assert restored.index == {"Leo": 0, "Nate": 1}
+    assert dict(restored["Nate"]) == dict(table["Nate"])
+
+
+def test_process_data_stage_table_equals_the_nested_dict_output(standings_sheet):
+    _, _, stage_by_stage_data = core.process_data(standings_sheet)
+    _, _, expected = legacy_process_data(standings_sheet)
+
+    assert isinstance(stage_by_stage_data, StageTable)
+    assert {name: {stage: dict(stage_info) for stage, stage_info in stages.items()} for name, stages in stage_by_stage_data.items()} == expected
+    # Charles has no stage 3 time ("0:00:00") and Aaron no stage 4 time
+    assert list(stage_by_stage_data["Charles"]) == [1, 2, 4]
+    assert 4 not in stage_by_stage_data["Aaron"]
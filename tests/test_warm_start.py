@@ -0,0 +1,38 @@
+import threading
+
+from resilience import load_snapshot
+from warm_start import SNAPSHOT_VERSION, WarmStart
+
+
+def bundle(token):
+    return {'processed_data': ([], 0, None), 'data_token': token, 'riders_token': "r", 'payload': "x" * 100_000}
+
+
+def test_concurrent_saves_leave_a_readable_snapshot(tmp_path):
+    path = str(tmp_path / "processed.pkl")
+    warm = WarmStart(path, lambda: bundle("refresh"))
+    warm.refreshed.wait(5)
+
+    threads = [threading.Thread(target=lambda n=n: [warm.save(bundle(f"{n}-{i}")) for i in range(20)]) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    saved = load_snapshot(path)
+    assert saved['version'] == SNAPSHOT_VERSION
+    assert (saved['bundle']['data_token'], saved['bundle']['riders_token']) == warm.saved_tokens
+    assert [name for name in tmp_path.iterdir() if name.suffix == ".tmp"] == []
+
+
+def test_restart_serves_the_saved_snapshot_until_refreshed(tmp_path):
+    path = str(tmp_path / "processed.pkl")
+    WarmStart(path, lambda: bundle("first")).refreshed.wait(5)
+
+    release = threading.Event()
+    warm = WarmStart(path, lambda: release.wait(5) and bundle("second"))
+    assert warm.serving_snapshot()
+    assert warm.snapshot['data_token'] == "first"
+    release.set()
+    warm.refreshed.wait(5)
+    assert not warm.serving_snapshot()
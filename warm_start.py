@@ -0,0 +1,58 @@
+import threading
+import time
+
+from resilience import load_snapshot, save_snapshot
+
+# Bumped whenever the shape of the saved bundle changes, so old files are ignored
+SNAPSHOT_VERSION = 1
+
+
+class WarmStart:
+    """Serve the last processed snapshot from disk while a background refresh runs.
+
+    On creation the snapshot at ``path`` is loaded and ``refresh()`` is started on
+    a daemon thread. Until that refresh finishes, ``snapshot`` holds the data to
+    show; afterwards the caller's normal (now warm) cache path takes over and
+    ``save()`` keeps the file current.
+    """
+
+    def __init__(self, path, refresh):
+        self.path = path
+        self.refreshed = threading.Event()
+        self.saved_tokens = None
+        self.error = None
+        self.lock = threading.Lock()  # The refresh thread and script threads both save
+
+        started = time.perf_counter()
+        saved = load_snapshot(path)
+        self.snapshot = saved['bundle'] if saved and saved.get('version') == SNAPSHOT_VERSION else None
+        self.load_ms = (time.perf_counter() - started) * 1000
+
+        self.thread = threading.Thread(target=self.revalidate, args=(refresh,), name="warm-start-refresh", daemon=True)
+        self.thread.start()
+
+    def revalidate(self, refresh):
+        try:
+            self.save(refresh())
+        except Exception as e:
+            self.error = e  # The script thread retries through the normal path
+        finally:
+            self.refreshed.set()
+
+    def serving_snapshot(self):
+        """True while the disk snapshot should be shown instead of waiting for upstream"""
+        return self.snapshot is not None and not self.refreshed.is_set()
+
+    def save(self, bundle):
+        """Persist a processed bundle when its data tokens changed since the last save"""
+        if bundle is None or bundle['processed_data'] is None:
+            return
+        tokens = (bundle['data_token'], bundle['riders_token'])
+        with self.lock:
+            if tokens == self.saved_tokens:
+                return
+            try:
+                save_snapshot(self.path, {'version': SNAPSHOT_VERSION, 'saved_at': time.time(), 'bundle': bundle})
+                self.saved_tokens = tokens
+            except OSError:
+                pass  # The next cold start just waits for upstream